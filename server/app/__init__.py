@@ -4,6 +4,7 @@ from flask_cors import CORS
 from dotenv import load_dotenv
 from .config import Config
 from .extensions import db, migrate
+from . import metrics
 
 def create_app():
     # Load environment variables from .env
@@ -24,6 +25,7 @@ def create_app():
 
     db.init_app(app)
     migrate.init_app(app, db)
+    metrics.init_app(app)
 
     @app.route("/ping")
     def ping():
@@ -44,4 +46,11 @@ def create_app():
     from . import routes  # noqa
     app.register_blueprint(routes.api_bp)
 
+    # Preload course catalogs so the first request doesn't pay for them
+    from .scripts.recommendation_engine import warm_catalog_cache
+    try:
+        warm_catalog_cache()
+    except Exception as e:
+        print(f"Warning: could not preload course catalogs: {e}")
+
     return app
@@ -0,0 +1,210 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# --- REQUEST INSTRUMENTATION ---
+# Named stages of a request are timed with `with stage('offerings'):`. Each
+# request reports its stage times in a Server-Timing header, and every
+# observation also lands in a process-wide histogram served by /metrics in
+# Prometheus text format, next to cache counters and DB queries per request.
+
+# Seconds; roughly x2.5 steps from 0.5 ms to 10 s
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label value."""
+
+    def __init__(self, name, help_text, label, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, value):
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                # [per-bucket counts..., +Inf count], sum
+                series = self._series[label_value] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+        for label_value, (counts, total) in sorted(series.items()):
+            label = f'{self.label}="{label_value}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{label}}} {cumulative}")
+        return lines
+
+
+stage_seconds = Histogram(
+    'smartadvisors_stage_duration_seconds', 'Time spent in each named request stage.',
+    'stage', DURATION_BUCKETS,
+)
+request_seconds = Histogram(
+    'smartadvisors_request_duration_seconds', 'Total request time by endpoint.',
+    'endpoint', DURATION_BUCKETS,
+)
+request_queries = Histogram(
+    'smartadvisors_db_queries_per_request', 'SQL statements run while serving one request.',
+    'endpoint', QUERY_BUCKETS,
+)
+
+
+@contextmanager
+def stage(name):
+    """Times a named stage. Repeated stages within one request add up."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_seconds.observe(name, elapsed)
+        if has_request_context():
+            timings = g.setdefault('stage_timings', {})
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def count_query(*_):
+    """Counts one SQL statement against the current request (if any)."""
+    if has_request_context():
+        g.db_queries = g.get('db_queries', 0) + 1
+
+
+def _count_sqlalchemy_query(conn, cursor, statement, parameters, context, executemany):
+    count_query()
+
+
+def server_timing(timings, total):
+    parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ', '.join(parts)
+
+
+def _cache_lines():
+    from .professor_index import professor_index
+    from .recommender import candidate_cache
+    from .response_cache import recommendation_cache
+    from .scripts.transcript_cache import transcript_cache
+    from .scripts import transcript_sandbox
+    from .scripts.transcript_jobs import transcript_jobs
+
+    responses = recommendation_cache.stats()
+    transcripts = transcript_cache.stats()
+    professors = professor_index.stats()
+    counters = [
+        ('smartadvisors_cache_hits_total', 'Cache lookups answered from the cache.', [
+            ('response', responses['hits']),
+            ('transcript', transcripts['hits'] + transcripts['disk_hits']),
+        ]),
+        ('smartadvisors_cache_misses_total', 'Cache lookups that had to compute the value.', [
+            ('response', responses['misses']),
+            ('transcript', transcripts['misses']),
+        ]),
+        ('smartadvisors_cache_evictions_total', 'Entries evicted to stay within cache bounds.', [
+            ('response', responses['evictions']),
+        ]),
+        ('smartadvisors_candidate_builds_total', 'Batches of course candidates built on a cache miss.', [
+            (None, candidate_cache.builds),
+        ]),
+        ('smartadvisors_professor_index_rebuilds_total', 'Professor index rebuilds after the data changed.', [
+            (None, professors['rebuilds']),
+        ]),
+    ]
+    lines = []
+    for name, help_text, samples in counters:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for cache, value in samples:
+            lines.append(f'{name}{{cache="{cache}"}} {value}' if cache else f"{name} {value}")
+
+    name = 'smartadvisors_professor_matches_total'
+    lines += [f"# HELP {name} Instructor names matched to professors, by matching tier.", f"# TYPE {name} counter"]
+    for tier in professor_index.TIERS:
+        lines.append(f'{name}{{tier="{tier}"}} {professors[tier]}')
+
+    name = 'smartadvisors_transcript_job_files_total'
+    lines += [f"# HELP {name} Transcripts handled by background jobs, by outcome.", f"# TYPE {name} counter"]
+    for outcome, value in transcript_jobs.stats().items():
+        lines.append(f'{name}{{outcome="{outcome}"}} {value}')
+
+    name = 'smartadvisors_transcript_parses_total'
+    lines += [f"# HELP {name} Sandboxed transcript parses, by outcome.", f"# TYPE {name} counter"]
+    for outcome, value in transcript_sandbox.stats().items():
+        lines.append(f'{name}{{outcome="{outcome}"}} {value}')
+
+    name = 'smartadvisors_cache_entries'
+    lines += [f"# HELP {name} Entries currently held.", f"# TYPE {name} gauge"]
+    lines.append(f'{name}{{cache="response"}} {responses["entries"]}')
+    lines.append(f'{name}{{cache="transcript"}} {transcripts["entries"]}')
+    return lines
+
+
+def render_metrics():
+    lines = []
+    for histogram in (request_seconds, stage_seconds, request_queries):
+        lines += histogram.render()
+    lines += _cache_lines()
+    return '\n'.join(lines) + '\n'
+
+
+def init_app(app):
+    """Registers the request hooks and the /metrics endpoint."""
+    from .scripts import recommendation_engine
+
+    if not event.contains(Engine, 'before_cursor_execute', _count_sqlalchemy_query):
+        event.listen(Engine, 'before_cursor_execute', _count_sqlalchemy_query)
+    # The catalog and grades databases are read with plain sqlite3
+    recommendation_engine.query_listener = count_query
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+
+    def record_request(endpoint, start, request_g):
+        request_seconds.observe(endpoint or 'unknown', time.perf_counter() - start)
+        request_queries.observe(endpoint or 'unknown', request_g.get('db_queries', 0))
+
+    @app.after_request
+    def add_server_timing(response):
+        start = g.get('request_start')
+        if start is None or request.endpoint == 'metrics':
+            return response
+        # A streamed body's stages are still running; the header has what ran before it
+        response.headers['Server-Timing'] = server_timing(
+            g.get('stage_timings', {}), time.perf_counter() - start
+        )
+        if response.is_streamed:
+            # Record once the whole body has been sent, not when the view returns
+            request_g = g._get_current_object()
+            endpoint = request.endpoint
+            response.call_on_close(lambda: record_request(endpoint, start, request_g))
+            g.request_recorded = True
+        return response
+
+    @app.teardown_request
+    def record_finished_request(exc=None):
+        start = g.get('request_start')
+        if start is None or g.get('request_recorded') or request.endpoint == 'metrics':
+            return
+        g.request_recorded = True
+        record_request(request.endpoint, start, g)
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
@@ -10,8 +10,11 @@ class User(db.Model):
 class Professor(db.Model):
     __tablename__ = 'professors'
     
-    id = db.Column(db.Integer, primary_key=True)
+    # RateMyProfessor's id, stored as TEXT by the scraper (the migration keeps it)
+    id = db.Column(db.Text, primary_key=True)
     name = db.Column(db.String(128))
+    # Name as listed on RateMyProfessor; used as a matching alias
+    rmp_name = db.Column(db.String(128))
     department = db.Column(db.String(128))
     
     # --- THE FIX IS HERE ---
@@ -21,7 +24,23 @@ class Professor(db.Model):
     # "When I say .difficulty, read the 'difficulty_rating' column"
     difficulty = db.Column('difficulty_rating', db.Float)
     
+    total_ratings = db.Column(db.Integer)
+
+    # Percentage (0 - 100) of students who would take the professor again
+    would_take_again = db.Column(db.Float)
+
+    # Raw comma-separated RateMyProfessor tags; tag_list is the normalized form
     tags = db.Column(db.String(512))
+    tag_list = db.relationship('ProfessorTag', backref='professor', lazy='select')
+
+    def __repr__(self):
+        return f"<Professor {self.name}>"
+
+class ProfessorTag(db.Model):
+    __tablename__ = 'professor_tags'
+
+    professor_id = db.Column(db.Text, db.ForeignKey('professors.id', ondelete='CASCADE'), primary_key=True)
+    tag = db.Column(db.String(64), primary_key=True, index=True)
 
     def __repr__(self):
-        return f"<Professor {self.name}>"
\ No newline at end of file
+        return f"<ProfessorTag {self.tag}>"
\ No newline at end of file
@@ -0,0 +1,163 @@
+import os
+import threading
+
+from .extensions import db
+from .models import Professor
+from .scoring import professor_features
+
+
+def normalize_name(name):
+    """
+    Casefold a name and collapse its whitespace so lookups are exact. Commas
+    are kept, written as ", ", so "Last, First" stays distinguishable.
+    """
+    parts = (' '.join(part.split()) for part in str(name or '').split(','))
+    return ', '.join(part for part in parts if part).casefold()
+
+
+def last_name(key):
+    """Last name of a normalize_name key: before the comma, else the last word."""
+    last, comma, _ = key.partition(',')
+    words = last.split()
+    return (words[0] if comma else words[-1]) if words else None
+
+
+def to_number(value, cast):
+    """
+    A rating as a number. Databases that predate the typed-columns migration
+    still hold text such as '49', '84%' or 'N/A'; unparseable values are None.
+    """
+    if value is None or isinstance(value, cast):
+        return value
+    text = str(value).strip().rstrip('%')
+    try:
+        return cast(float(text)) if cast is int else cast(text)
+    except ValueError:
+        return None
+
+
+class ProfessorRecord:
+    """Read-only copy of a professors row that outlives the request session."""
+    FIELDS = (
+        'id', 'name', 'rmp_name', 'department', 'rating', 'difficulty',
+        'total_ratings', 'would_take_again', 'tags'
+    )
+    # Declared numeric on the model, but SQLite returns unmigrated TEXT as is
+    NUMERIC_FIELDS = {'total_ratings': int, 'would_take_again': float}
+    __slots__ = FIELDS + ('features',)
+
+    def __init__(self, prof):
+        for field in self.FIELDS:
+            value = getattr(prof, field)
+            if field in self.NUMERIC_FIELDS:
+                value = to_number(value, self.NUMERIC_FIELDS[field])
+            setattr(self, field, value)
+        # (base score, difficulty, tag bitmask), parsed once for the batch scorer
+        self.features = professor_features(self.rating, self.difficulty, self.tags)
+
+    def __repr__(self):
+        return f"<ProfessorRecord {self.name}>"
+
+
+class ProfessorIndex:
+    """
+    Process-wide name index over the professors table.
+
+    Holds three hash maps (full name, "Last, First" and last name), each fed by
+    both `name` and the `rmp_name` alias, so matching an instructor is a few
+    dict lookups instead of ILIKE queries. When several professors share a key
+    the one that sorts first by (name, id) wins, so results are deterministic.
+    The index rebuilds itself when the database file or table changes.
+    """
+    TIERS = ('exact', 'swapped', 'last_name', 'miss')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self.records = []
+        self.by_name = {}
+        self.by_swapped = {}
+        self.by_last_name = {}
+        # lookup() runs on many request threads at once
+        self._counters_lock = threading.Lock()
+        self.counters = dict.fromkeys(self.TIERS, 0)
+        self.rebuilds = 0
+
+    def _data_version(self):
+        # SQLite: the file changes whenever the table does, so stat() is enough
+        url = db.engine.url
+        if url.get_backend_name() == 'sqlite' and url.database and url.database != ':memory:':
+            try:
+                st = os.stat(url.database)
+                return (url.database, st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass
+        count, max_id = db.session.query(db.func.count(Professor.id), db.func.max(Professor.id)).one()
+        return (str(url), count, max_id)
+
+    def refresh(self):
+        """Rebuild the maps if the professors data changed since the last build."""
+        version = self._data_version()
+        if version == self.version:
+            return
+        with self._lock:
+            if version == self.version:
+                return
+            self._build(version)
+
+    def _build(self, version):
+        records = [ProfessorRecord(prof) for prof in Professor.query.all()]
+        records.sort(key=lambda r: (normalize_name(r.name), str(r.id)))
+
+        by_name, by_swapped, by_last_name = {}, {}, {}
+        for record in records:
+            for alias in (record.name, record.rmp_name):
+                # Keys go through normalize_name exactly as lookup() keys do
+                key = normalize_name(alias)
+                if not key:
+                    continue
+                by_name.setdefault(key, record)
+                parts = key.split()
+                if ',' not in key and len(parts) >= 2:
+                    by_swapped.setdefault(normalize_name(f"{parts[-1]}, {' '.join(parts[:-1])}"), record)
+                by_last_name.setdefault(last_name(key), record)
+
+        # Swap the maps in together so readers never see a half-built index
+        self.records = records
+        self.by_name, self.by_swapped, self.by_last_name = by_name, by_swapped, by_last_name
+        self.version = version
+        self.rebuilds += 1
+
+    def lookup(self, prof_name):
+        """
+        Match one instructor name: exact, then "Smith, John" -> "John Smith",
+        then last name. Returns a ProfessorRecord or None.
+        """
+        key = normalize_name(prof_name)
+        record = self.by_name.get(key)
+        tier = 'exact'
+
+        if not record and ',' in key:
+            record = self.by_swapped.get(key)
+            tier = 'swapped'
+
+        if not record and key:
+            record = self.by_last_name.get(last_name(key))
+            tier = 'last_name'
+
+        with self._counters_lock:
+            self.counters[tier if record else 'miss'] += 1
+        return record
+
+    def resolve_many(self, names):
+        """Refresh once, then match every name. Returns {name: record or None}."""
+        self.refresh()
+        return {name: self.lookup(name) for name in set(names)}
+
+    def stats(self):
+        with self._counters_lock:
+            counters = dict(self.counters)
+        return {'professors': len(self.records), 'rebuilds': self.rebuilds, **counters}
+
+
+professor_index = ProfessorIndex()
@@ -0,0 +1,322 @@
+import json
+import sys
+import threading
+from itertools import repeat
+from operator import and_, itemgetter
+
+from .metrics import stage
+from .professor_index import professor_index
+from .scoring import compile_preferences, firing_rules, score_features, score_fired
+from .scripts.recommendation_engine import get_offerings_for_courses, get_data_version
+
+# Instructor placeholders that are not real professors
+PLACEHOLDER_INSTRUCTORS = ['staff', 'tba', 'unknown']
+
+
+def current_data_version():
+    """Version of everything a recommendation reads: catalog, grades and professors."""
+    professor_index.refresh()
+    return get_data_version() + (professor_index.version,)
+
+
+# Stands in for a value while a JSON template is encoded, then is cut back
+# out; a NUL cannot appear unescaped, so its encoding is the same everywhere
+JSON_SLOT = '\x00slot'
+_ENCODED_SLOT = json.dumps(JSON_SLOT)
+
+
+def json_template(dumps, obj):
+    """(head, tail) of dumps(obj) around the one value that is JSON_SLOT."""
+    head, tail = dumps(obj).split(_ENCODED_SLOT)
+    return head, tail
+
+
+class Candidate:
+    """
+    One professor who has taught a course, with everything about them that
+    does not depend on the user. Only the match score is computed per request.
+    """
+    __slots__ = ('entry', 'features', '_template')
+
+    def __init__(self, entry, features):
+        self.entry = entry
+        self.features = features
+        self._template = None
+
+    def json_template(self, dumps):
+        """The entry encoded with `dumps` as (head, tail) around its matchScore value."""
+        template = self._template
+        if template is None or template[0] != dumps:
+            template = self._template = (dumps, *json_template(dumps, dict(self.entry, matchScore=JSON_SLOT)))
+        return template[1:]
+
+
+def _build_candidate(position, prof_name, offer, db_prof):
+    # GET DATA (Safe defaults)
+    final_rating = 0.0
+    if db_prof and db_prof.rating is not None:
+        try: final_rating = float(db_prof.rating)
+        except: final_rating = 0.0
+    else:
+        try: final_rating = round(float(offer.get('course_gpa', 0) or 0), 1)
+        except: final_rating = 0.0
+
+    final_tags = []
+    if db_prof and db_prof.tags:
+        final_tags = str(db_prof.tags).split(',')
+
+    final_difficulty = "Moderate"
+    if db_prof and db_prof.difficulty:
+        try:
+            diff_val = float(db_prof.difficulty)
+            if diff_val < 2.5: final_difficulty = "Easy"
+            elif diff_val > 3.8: final_difficulty = "Hard"
+        except: pass
+
+    entry = {
+        'id': str(position),
+        'name': prof_name,
+        'rating': final_rating,
+        'difficulty': final_difficulty,
+        'schedule': f"{offer.get('year','')} {offer.get('semester','')}".strip(),
+        'tags': final_tags,
+        'reviewCount': (db_prof.total_ratings or 0) if db_prof else 0,
+        'classSize': 'Unknown', 'assessmentType': 'Unknown', 'attendance': 'Unknown'
+    }
+    return Candidate(entry, db_prof.features if db_prof else None)
+
+
+def build_course_candidates(course_codes):
+    """
+    Returns {course_code: (Candidate, ...)} for the given courses: their
+    offerings in one batched query and every instructor matched in one pass.
+    """
+    with stage('offerings'):
+        offerings_by_course = get_offerings_for_courses(course_codes)
+
+    # Collect every instructor first so they can be matched in one pass
+    instructor_names = set()
+    for offerings in offerings_by_course.values():
+        for offer in offerings:
+            for prof_name in offer['instructors']:
+                # CLEANUP: Skip "Staff" or "TBA" placeholders
+                if prof_name and prof_name.lower() not in PLACEHOLDER_INSTRUCTORS:
+                    instructor_names.add(prof_name)
+
+    with stage('professor_match'):
+        matched_profs = professor_index.resolve_many(instructor_names)
+
+    candidates_by_course = {}
+    for code, offerings in offerings_by_course.items():
+        candidates = []
+        seen = set()
+        for offer in offerings:
+            for prof_name in offer['instructors']:
+                if not prof_name or prof_name.lower() in PLACEHOLDER_INSTRUCTORS or prof_name in seen:
+                    continue
+                seen.add(prof_name)
+                try:
+                    candidates.append(_build_candidate(len(candidates), prof_name, offer, matched_profs.get(prof_name)))
+                except Exception as inner_e:
+                    print(f"Skipping prof {prof_name}: {inner_e}", file=sys.stderr)
+        candidates_by_course[code] = tuple(candidates)
+    return candidates_by_course
+
+
+class CandidateCache:
+    """
+    Per-department cache of the professor candidates for each course. Courses
+    are filled in on first request (all missing ones in one batch) and the
+    whole department is dropped when classes.db, grades.sqlite or the
+    professors table change. A version's dict only ever gains entries, so it
+    is filled in place and readers outside the lock can index it as it grows.
+    Builds take a lock per (department, version), so a cold department does
+    not hold up requests for the others; the cache-wide lock only guards
+    looking that lock up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # department -> (version, {course_code: candidates}, build lock)
+        self._departments = {}
+        self.builds = 0
+
+    def get(self, department, course_codes, version=None):
+        """Returns {course_code: (Candidate, ...)} for the given courses."""
+        version = version or current_data_version()
+        cached = self._departments.get(department)
+        if cached and cached[0] == version and all(code in cached[1] for code in course_codes):
+            return cached[1]
+        with self._lock:
+            cached = self._departments.get(department)
+            if not cached or cached[0] != version:
+                cached = (version, {}, threading.Lock())
+                self._departments[department] = cached
+        version, candidates, build_lock = cached
+        with build_lock:
+            missing = [code for code in course_codes if code not in candidates]
+            if missing:
+                # Build first, then add: O(missing) per fill, not a copy of the department
+                candidates.update(build_course_candidates(missing))
+                with self._lock:
+                    self.builds += 1
+        return candidates
+
+    def clear(self):
+        with self._lock:
+            self._departments.clear()
+
+candidate_cache = CandidateCache()
+
+
+def rank_candidates(course_candidates, rules):
+    """
+    Scores every candidate of every course against compiled preference rules
+    in one batch and returns, per course, the professor dicts sorted by match
+    score (highest first).
+    """
+    with stage('scoring'):
+        flat = [candidate for candidates in course_candidates for candidate in candidates]
+        scores = iter(score_features([candidate.features for candidate in flat], rules))
+
+        ranked = []
+        for candidates in course_candidates:
+            professors_list = [dict(candidate.entry, matchScore=next(scores)) for candidate in candidates]
+            # Sort by Match Score (Highest First)
+            professors_list.sort(key=lambda x: x['matchScore'], reverse=True)
+            ranked.append(professors_list)
+        return ranked
+
+
+def _course_result(code, course, professors_list):
+    return {
+        'courseCode': code,
+        'courseName': course['Course_Name'],
+        'professors': professors_list
+    }
+
+
+def build_recommendations(department, eligible, user_prefs, data_version=None):
+    """
+    Recommendation list for the eligible courses: cached candidates plus a
+    preference-only rescoring, so nothing but scoring and sorting runs per request.
+    """
+    codes = list(eligible)
+    cached = candidate_cache.get(department, codes, data_version)
+    ranked = rank_candidates([cached[code] for code in codes], compile_preferences(user_prefs))
+    return [_course_result(code, eligible[code], professors_list) for code, professors_list in zip(codes, ranked)]
+
+
+def iter_recommendations(department, eligible, user_prefs, data_version=None):
+    """
+    Same results as build_recommendations, one course at a time, each yielded
+    as soon as its own candidates are resolved (for streaming responses).
+    """
+    rules = compile_preferences(user_prefs)
+    for code, course in eligible.items():
+        candidates = candidate_cache.get(department, [code], data_version)[code]
+        yield _course_result(code, course, rank_candidates([candidates], rules)[0])
+
+
+def preferences_key(user_prefs):
+    """The preferences as compile_preferences sees them: which flags are truthy."""
+    return frozenset(key for key, value in user_prefs.items() if value)
+
+
+class _CohortCourse:
+    """
+    One course's candidates as the cohort ranker sees them: for each, the bits
+    of the preference rules that fire on it and its encoded entry per
+    combination of those rules a student has on; and the encoded course per
+    combination of rules on that fire on any of its candidates.
+    """
+    __slots__ = ('template', 'candidates', 'templates', 'fires', 'encoded', 'fires_any', 'ranked')
+
+    def __init__(self, code, course, candidates, rule_bits, dumps):
+        self.template = json_template(dumps, _course_result(code, course, JSON_SLOT))
+        self.candidates = candidates
+        self.templates = [candidate.json_template(dumps) for candidate in candidates]
+        self.fires = [firing_rules(candidate.features, rule_bits) for candidate in candidates]
+        # Per candidate: {firing rule bits on: (-score, position, encoded entry)}
+        self.encoded = [{} for _ in candidates]
+        self.fires_any = 0
+        for fires in self.fires:
+            self.fires_any |= fires
+        self.ranked = {}
+
+
+def iter_cohort_recommendations(department, eligibles, user_prefs_list, dumps, data_version=None):
+    """
+    Recommendations for many students of one department, already encoded:
+    yields, per student in order, one `dumps`-encoded JSON object per eligible
+    course, equal to what build_recommendations returns for that student.
+
+    Candidates for the union of the eligible courses are resolved in one
+    batch and every distinct set of preferences is compiled once, each rule
+    becoming a bit. A candidate's score only depends on which of the rules
+    that fire on it a student has on, so each (candidate, rules on) pair is
+    scored and encoded once, and each course is ranked and encoded once per
+    combination of its rules that students have on, however different the
+    rest of their preferences are.
+    """
+    # Course code -> its row, for the union of the eligible courses (first wins)
+    union = {}
+    for eligible in reversed(eligibles):
+        union.update(eligible)
+    cached = candidate_cache.get(department, list(union), data_version)
+
+    compiled = {}
+    rule_bits = {}
+    for user_prefs in user_prefs_list:
+        prefs_key = preferences_key(user_prefs)
+        if prefs_key not in compiled:
+            rules = compile_preferences(user_prefs)
+            for rule in rules:
+                rule_bits.setdefault(rule, 1 << len(rule_bits))
+            compiled[prefs_key] = ([(rule_bits[rule], rule) for rule in rules], sum(rule_bits[rule] for rule in rules))
+
+    # (features, firing rule bits) -> (-score, its JSON), and score -> its JSON
+    scores = {}
+    score_json = {}
+
+    with stage('scoring'):
+        courses = {
+            code: _CohortCourse(code, course, cached[code], rule_bits, dumps) for code, course in union.items()
+        }
+    by_entry = itemgetter(2)
+    for eligible, user_prefs in zip(eligibles, user_prefs_list):
+        bit_rules, rules_on = compiled[preferences_key(user_prefs)]
+        encoded_courses = []
+        with stage('scoring'):
+            for code in eligible:
+                state = courses[code]
+                on = rules_on & state.fires_any
+                encoded_course = state.ranked.get(on)
+                if encoded_course is None:
+                    # Looked up per candidate in C (map), as this runs for every new combination
+                    professors = list(map(dict.get, state.encoded, map(and_, state.fires, repeat(on))))
+                    if None in professors:
+                        for i, scored in enumerate(professors):
+                            if scored is not None:
+                                continue
+                            features = state.candidates[i].features
+                            fired = state.fires[i] & on
+                            key = (features, fired)
+                            scored = scores.get(key)
+                            if scored is None:
+                                # compile_preferences always orders rules the same, so any
+                                # student's list gives the same float sums
+                                score = score_fired(features, bit_rules, fired)
+                                # 0.0 and -0.0 are one dict key but encode differently
+                                json_key = score or str(score)
+                                if json_key not in score_json:
+                                    score_json[json_key] = dumps(score)
+                                scored = scores[key] = (-score, score_json[json_key])
+                            head, tail = state.templates[i]
+                            professors[i] = state.encoded[i][fired] = (scored[0], i, head + scored[1] + tail)
+                    # Sort by Match Score (Highest First), ties in candidate order
+                    professors.sort()
+                    head, tail = state.template
+                    encoded_course = state.ranked[on] = f"{head}[{', '.join(map(by_entry, professors))}]{tail}"
+                encoded_courses.append(encoded_course)
+        yield encoded_courses
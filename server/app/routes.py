@@ -1,105 +1,96 @@
-from flask import Blueprint, request, jsonify
-from werkzeug.utils import secure_filename
+from flask import Blueprint, current_app, request, jsonify, stream_with_context
 from werkzeug.datastructures import FileStorage # Import for type hinting
 import os
 import tempfile
 import sys
 import traceback
 import json
+import time
 
-from app.models import Professor
-
-from .scripts.recommendation_engine import (
-    get_department_courses,
-    filter_eligible_courses_unique,
-    get_professor_offerings_for_course
+from .metrics import stage
+from .response_cache import recommendation_cache, recommendation_cache_key
+from .recommender import (
+    JSON_SLOT, build_recommendations, current_data_version, iter_cohort_recommendations, iter_recommendations,
+    json_template,
 )
-from .scripts.parse_transcript import extract_all_courses
+
+from .scripts.recommendation_engine import get_prerequisite_graph
+from .scripts.parse_transcript import TranscriptParseError
+from .scripts.transcript_cache import transcript_cache, transcript_digest
+from .scripts.transcript_jobs import transcript_jobs
+from .scripts.transcript_sandbox import MAX_BYTES as TRANSCRIPT_MAX_BYTES, parse_transcript_sandboxed
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
-# --- IMPROVED SCORING ALGORITHM ---
-def calculate_match_score(professor_obj, user_prefs):
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Uploads up to this size are parsed from memory; bigger ones spill to a temp file
+TRANSCRIPT_SPOOL_LIMIT = int(os.getenv('TRANSCRIPT_SPOOL_LIMIT', str(8 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Most students accepted by one /api/recommendations/batch call
+BATCH_MAX_STUDENTS = int(os.getenv('BATCH_MAX_STUDENTS', '1000'))
+
+# Most PDFs accepted by one transcript job, and how a ?stream=1 status watch polls
+TRANSCRIPT_JOB_MAX_FILES = int(os.getenv('TRANSCRIPT_JOB_MAX_FILES', '200'))
+# Every PDF of a job is held in memory until it is handed to the parse pool
+TRANSCRIPT_JOB_MAX_BYTES = int(os.getenv('TRANSCRIPT_JOB_MAX_BYTES', str(64 * 1024 * 1024)))
+JOB_STREAM_INTERVAL = float(os.getenv('TRANSCRIPT_JOB_STREAM_INTERVAL', '0.5'))
+# Kept short: a watch holds a worker for its whole life, so long jobs are polled
+JOB_STREAM_TIMEOUT = float(os.getenv('TRANSCRIPT_JOB_STREAM_TIMEOUT', '20'))
+
+def iter_upload_chunks(file: FileStorage):
     """
-    Sophisticated scoring based on Rating, Difficulty, and Tags.
+    Reads an upload in chunks, raising TranscriptParseError('too_large') as
+    soon as it passes TRANSCRIPT_MAX_BYTES instead of buffering the rest.
     """
-    if not professor_obj:
-        return 0.0
-    
-    # 1. BASELINE: Start with the Quality Rating (0 - 5)
-    try:
-        base_score = float(professor_obj.rating) if professor_obj.rating else 2.5
-    except:
-        base_score = 2.5
-        
-    score = base_score
-    
-    # Get Data safely
-    try:
-        difficulty = float(professor_obj.difficulty) if professor_obj.difficulty else 3.0
-    except:
-        difficulty = 3.0
+    size = 0
+    for chunk in iter(lambda: file.stream.read(UPLOAD_CHUNK_SIZE), b''):
+        size += len(chunk)
+        if TRANSCRIPT_MAX_BYTES and size > TRANSCRIPT_MAX_BYTES:
+            name = f"Transcript {file.filename}" if file.filename else "Transcript"
+            raise TranscriptParseError(f"{name} is over the {TRANSCRIPT_MAX_BYTES} byte limit", 'too_large')
+        yield chunk
 
-    try:
-        tags_str = str(professor_obj.tags).lower() if professor_obj.tags else ""
-    except:
-        tags_str = ""
-    
-    # --- 2. LOGIC APPLICATION ---
 
-    # A. EASY GRADER LOGIC
-    if user_prefs.get('extraCredit'):
-        if "extra credit" in tags_str:
-            score += 1.0
+def spool_chunks(chunks, buffer):
+    """Passes the chunks through, writing each one to `buffer` on the way."""
+    for chunk in chunks:
+        buffer.write(chunk)
+        yield chunk
 
-    if user_prefs.get('easyGrader') or user_prefs.get('clearGrading'):
-        # Bonus for low difficulty (1.0 difficulty = +2.0 boost)
-        difficulty_bonus = (5.0 - difficulty) * 0.5 
-        score += difficulty_bonus
-        
-        if any(t in tags_str for t in ['easy grader', 'clear grading', 'graded by few things']):
-            score += 1.0
-        if any(t in tags_str for t in ['tough grader', 'hard grader']):
-            score -= 1.5
-
-    # B. TEACHING QUALITY
-    if user_prefs.get('caring') or user_prefs.get('goodFeedback'):
-        if any(t in tags_str for t in ['caring', 'respected', 'inspirational', 'accessible', 'good feedback']):
-            score += 1.2
-    
-    # C. LEARNING STYLE
-    if user_prefs.get('lectureHeavy'):
-        if "amazing lectures" in tags_str:
-            score += 1.5
-        elif "lecture heavy" in tags_str:
-            score += 0.5 
-    
-    if user_prefs.get('groupProjects'):
-        if "group projects" in tags_str:
-            score += 1.0
-    else:
-        # User dislikes groups (default assumption)
-        if "group projects" in tags_str:
-            score -= 0.5
 
-    # D. "DEAL BREAKERS"
-    if not user_prefs.get('testHeavy'):
-        if any(t in tags_str for t in ['test heavy', 'tests are tough']):
-            score -= 1.5 
+def courses_from_upload(file: FileStorage):
+    """
+    Returns the course codes in an uploaded transcript. The upload is hashed and
+    parsed straight from memory; only uploads over TRANSCRIPT_SPOOL_LIMIT bytes
+    spill to an anonymous temp file. Repeat uploads of the same PDF are
+    answered from the transcript cache without re-parsing. Parsing runs in the
+    transcript sandbox, so a bad upload raises TranscriptParseError.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=TRANSCRIPT_SPOOL_LIMIT) as buffer:
+        with stage('upload'):
+            digest = transcript_digest(spool_chunks(iter_upload_chunks(file), buffer))
 
-    if not user_prefs.get('homeworkHeavy'):
-        if any(t in tags_str for t in ['lots of homework', 'so many papers']):
-            score -= 1.0
+        courses = transcript_cache.get(digest)
+        if courses is not None:
+            return courses
 
-    if not user_prefs.get('strictAttendance'):
-        if any(t in tags_str for t in ['attendance mandatory', 'skip class']):
-            score -= 1.0
+        buffer.seek(0)
+        with stage('pdf_parse'):
+            courses = parse_transcript_sandboxed(buffer)
 
-    if not user_prefs.get('popQuizzes'):
-        if "pop quizzes" in tags_str:
-            score -= 2.0 
+    # A transcript without courses may be a new student's; cache only real results
+    if courses:
+        transcript_cache.put(digest, courses)
+    return courses
 
-    return round(score, 1)
+
+def transcript_error_response(error: TranscriptParseError):
+    # Distinct from a transcript that simply lists no courses
+    print(f"Transcript rejected ({error.reason}): {error}", file=sys.stderr)
+    status = 413 if error.reason == 'too_large' else 422
+    return jsonify({'error': str(error), 'reason': error.reason}), status
 
 
 @api_bp.route('/parse-transcript', methods=['POST'])
@@ -115,24 +106,45 @@ def parse_transcript():
         if not file or file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
 
-        temp_dir = tempfile.gettempdir()
-        # Safe handling of filename
-        fname = secure_filename(file.filename or "temp.pdf")
-        temp_path = os.path.join(temp_dir, fname)
-        file.save(temp_path)
-        
-        courses = extract_all_courses(temp_path)
-        
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        courses = courses_from_upload(file)
         
         return jsonify({'success': True, 'courses': courses}), 200
-        
+
+    except TranscriptParseError as e:
+        return transcript_error_response(e)
     except Exception as e:
         traceback.print_exc(file=sys.stderr)
         return jsonify({'error': str(e)}), 500
 
 
+def eligible_courses(department, completed_courses):
+    with stage('catalog'):
+        graph = get_prerequisite_graph(department)
+    with stage('eligibility'):
+        return graph.eligible(completed_courses)
+
+
+def stream_recommendations(department, eligible, user_prefs, data_version):
+    """
+    NDJSON response: a header record, then one course object per line as soon
+    as that course is resolved, so the first byte doesn't wait for every course.
+    """
+    json_provider = current_app.json
+
+    def generate():
+        yield json_provider.dumps({'success': True, 'department': department, 'courseCount': len(eligible)}) + '\n'
+        try:
+            for course_result in iter_recommendations(department, eligible, user_prefs, data_version):
+                with stage('serialize'):
+                    line = json_provider.dumps(course_result) + '\n'
+                yield line
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            yield json_provider.dumps({'error': str(e)}) + '\n'
+
+    return current_app.response_class(stream_with_context(generate()), status=200, mimetype=NDJSON_MIMETYPE)
+
+
 @api_bp.route('/recommendations', methods=['POST'])
 def get_recommendations():
     print("\n=== RECOMMENDATIONS ROUTE CALLED ===", file=sys.stderr)
@@ -150,20 +162,18 @@ def get_recommendations():
         
         try:
             if raw_courses and raw_courses != 'undefined':
-                completed_courses = json.loads(raw_courses)
+                completed_courses = json.loads(raw_courses) or []
         except:
             print("Error parsing completed_courses JSON", file=sys.stderr)
+        if not is_course_list(completed_courses):
+            # e.g. completed_courses='5': valid JSON, but not course codes
+            return jsonify({'error': 'completed_courses must be a list of course codes'}), 400
         
         # Fallback: Parse file if list is missing
         if not completed_courses and 'transcript' in request.files:
             file: FileStorage = request.files['transcript']
             if file and file.filename:
-                temp_dir = tempfile.gettempdir()
-                fname = secure_filename(file.filename)
-                temp_path = os.path.join(temp_dir, fname)
-                file.save(temp_path)
-                completed_courses = extract_all_courses(temp_path)
-                if os.path.exists(temp_path): os.remove(temp_path)
+                completed_courses = courses_from_upload(file)
 
         # 2. GET PREFERENCES
         user_prefs = {}
@@ -172,95 +182,239 @@ def get_recommendations():
             user_prefs = json.loads(raw_prefs)
         except:
             pass
+        if not isinstance(user_prefs, dict):
+            # e.g. preferences='[1]': valid JSON, but no flags to read
+            user_prefs = {}
 
-        # 3. LOGIC ENGINE
-        all_courses = get_department_courses(department)
-        eligible = filter_eligible_courses_unique(all_courses, completed_courses)
-        
-        result = []
-        for code, course in eligible.items():
-            offerings = get_professor_offerings_for_course(code)
-            
-            professors_list = []
-            seen = set()
-            
-            for offer in offerings:
-                for prof_name in offer['instructors']:
-                    
-                    # CLEANUP: Skip "Staff" or "TBA" placeholders
-                    if not prof_name or prof_name.lower() in ['staff', 'tba', 'unknown']:
-                        continue
-
-                    if prof_name not in seen:
-                        seen.add(prof_name)
-                        
-                        try:
-                            # --- ROBUST NAME MATCHING ---
-                            db_prof = Professor.query.filter(Professor.name.ilike(prof_name)).first()
-                            
-                            # Swap Check: "Smith, John" -> "John Smith"
-                            if not db_prof and ',' in prof_name:
-                                parts = prof_name.split(',')
-                                if len(parts) >= 2:
-                                    swapped = f"{parts[1].strip()} {parts[0].strip()}"
-                                    db_prof = Professor.query.filter(Professor.name.ilike(swapped)).first()
-                            
-                            # Fuzzy Last Name Check
-                            if not db_prof:
-                                parts = prof_name.replace(',', '').split()
-                                if len(parts) > 0:
-                                    last_name = parts[0] if ',' in prof_name else parts[-1]
-                                    db_prof = Professor.query.filter(Professor.name.ilike(f"%{last_name}%")).first()
-
-                            # CALCULATE SCORE
-                            match_score = calculate_match_score(db_prof, user_prefs)
-                            
-                            # GET DATA (Safe defaults)
-                            final_rating = 0.0
-                            if db_prof and db_prof.rating is not None: 
-                                try: final_rating = float(db_prof.rating)
-                                except: final_rating = 0.0
-                            else:
-                                try: final_rating = round(float(offer.get('course_gpa', 0) or 0), 1)
-                                except: final_rating = 0.0
-                            
-                            final_tags = []
-                            if db_prof and db_prof.tags:
-                                final_tags = str(db_prof.tags).split(',')
-
-                            final_difficulty = "Moderate"
-                            if db_prof and db_prof.difficulty:
-                                try:
-                                    diff_val = float(db_prof.difficulty)
-                                    if diff_val < 2.5: final_difficulty = "Easy"
-                                    elif diff_val > 3.8: final_difficulty = "Hard"
-                                except: pass
-
-                            professors_list.append({
-                                'id': str(len(professors_list)),
-                                'name': prof_name,
-                                'rating': final_rating,
-                                'difficulty': final_difficulty,
-                                'matchScore': match_score,
-                                'schedule': f"{offer.get('year','')} {offer.get('semester','')}".strip(),
-                                'tags': final_tags,
-                                'reviewCount': 0, 'classSize': 'Unknown', 'assessmentType': 'Unknown', 'attendance': 'Unknown'
-                            })
-                        except Exception as inner_e:
-                            print(f"Skipping prof {prof_name}: {inner_e}", file=sys.stderr)
-                            continue
-            
-            # Sort by Match Score (Highest First)
-            professors_list.sort(key=lambda x: x['matchScore'], reverse=True)
-            
-            result.append({
-                'courseCode': code, 
-                'courseName': course['Course_Name'], 
-                'professors': professors_list
-            })
+        data_version = current_data_version()
+
+        # Opt-in streaming: ?stream=1 or Accept: application/x-ndjson
+        wants_stream = request.args.get('stream') == '1' or (
+            request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+        )
+        if wants_stream:
+            eligible = eligible_courses(department, completed_courses)
+            return stream_recommendations(department, eligible, user_prefs, data_version)
+
+        # 3. RESPONSE CACHE: same inputs + same data version -> same bytes
+        cache_key = recommendation_cache_key(department, completed_courses, user_prefs, data_version)
+        etag = cache_key[:32]
+        if request.if_none_match.contains(etag):
+            not_modified = current_app.response_class(status=304)
+            not_modified.set_etag(etag)
+            return not_modified
+
+        cached_body = recommendation_cache.get(cache_key)
+        if cached_body is not None:
+            response = current_app.response_class(cached_body, status=200, mimetype='application/json')
+            response.set_etag(etag)
+            return response
+
+        # 4. LOGIC ENGINE
+        eligible = eligible_courses(department, completed_courses)
         
-        return jsonify({'success': True, 'recommendations': result}), 200
+        result = build_recommendations(department, eligible, user_prefs, data_version)
         
+        with stage('serialize'):
+            response = jsonify({'success': True, 'recommendations': result})
+            body = response.get_data()
+        recommendation_cache.put(cache_key, body)
+        response.set_etag(etag)
+        return response, 200
+
+    except TranscriptParseError as e:
+        return transcript_error_response(e)
     except Exception as e:
         traceback.print_exc(file=sys.stderr)
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+def is_course_list(value):
+    """True for a list of course code strings, the only completed_courses accepted."""
+    return isinstance(value, list) and all(isinstance(code, str) for code in value)
+
+
+def parse_batch_student(student):
+    """(department, completed_courses, preferences) from one batch entry, or ValueError."""
+    if not isinstance(student, dict):
+        raise ValueError('Each student must be an object')
+    department = student.get('department')
+    if not department or not isinstance(department, str):
+        raise ValueError('Department required')
+    completed_courses = student.get('completed_courses') or []
+    if not is_course_list(completed_courses):
+        raise ValueError('completed_courses must be a list of course codes')
+    user_prefs = student.get('preferences') or {}
+    if not isinstance(user_prefs, dict):
+        raise ValueError('preferences must be an object')
+    return department, completed_courses, user_prefs
+
+
+def stream_batch_recommendations(students, data_version):
+    """
+    NDJSON response for a cohort: a header record, then one record per
+    student. Students are grouped by department so each catalog, prerequisite
+    graph and candidate set is loaded once; records therefore arrive grouped
+    by department and carry the student's `index` in the request.
+    """
+    json_provider = current_app.json
+
+    def student_line(index, recommendations=None, **fields):
+        record = {'index': index, 'id': students[index].get('id') if isinstance(students[index], dict) else None}
+        record.update(fields)
+        with stage('serialize'):
+            if recommendations is None:
+                return json_provider.dumps(record) + '\n'
+            # Courses arrive already encoded (and shared between students), so
+            # they are spliced into the encoded record
+            head, tail = json_template(json_provider.dumps, dict(record, recommendations=JSON_SLOT))
+            return f"{head}[{', '.join(recommendations)}]{tail}\n"
+
+    def generate():
+        yield json_provider.dumps({'success': True, 'studentCount': len(students)}) + '\n'
+
+        by_department = {}
+        for index, student in enumerate(students):
+            try:
+                department, completed_courses, user_prefs = parse_batch_student(student)
+            except ValueError as e:
+                yield student_line(index, error=str(e))
+                continue
+            by_department.setdefault(department, []).append((index, completed_courses, user_prefs))
+
+        for department, members in by_department.items():
+            answered = 0
+            try:
+                with stage('catalog'):
+                    graph = get_prerequisite_graph(department)
+                with stage('eligibility'):
+                    eligibles = graph.eligible_many([completed for _, completed, _ in members])
+                results = iter_cohort_recommendations(
+                    department, eligibles, [prefs for _, _, prefs in members], json_provider.dumps, data_version
+                )
+                for (index, _, _), result in zip(members, results):
+                    yield student_line(index, recommendations=result, success=True, department=department)
+                    answered += 1
+            except Exception as e:
+                traceback.print_exc(file=sys.stderr)
+                # Students of this department that were not answered yet
+                for index, _, _ in members[answered:]:
+                    yield student_line(index, error=str(e))
+
+    return current_app.response_class(stream_with_context(generate()), status=200, mimetype=NDJSON_MIMETYPE)
+
+
+@api_bp.route('/recommendations/batch', methods=['POST'])
+def get_batch_recommendations():
+    print("\n=== BATCH RECOMMENDATIONS ROUTE CALLED ===", file=sys.stderr)
+
+    try:
+        payload = request.get_json(silent=True)
+        # Accept {"students": [...]} or a bare list
+        students = payload.get('students') if isinstance(payload, dict) else payload
+        if not isinstance(students, list) or not students:
+            return jsonify({'error': 'A non-empty list of students is required'}), 400
+        if len(students) > BATCH_MAX_STUDENTS:
+            return jsonify({'error': f'At most {BATCH_MAX_STUDENTS} students per batch'}), 413
+
+        return stream_batch_recommendations(students, current_data_version())
+
+    except Exception as e:
+        traceback.print_exc(file=sys.stderr)
+        return jsonify({'error': str(e)}), 500
+
+
+@api_bp.route('/transcript-jobs', methods=['POST'])
+def create_transcript_job():
+    print("\n=== CREATE TRANSCRIPT JOB ROUTE CALLED ===", file=sys.stderr)
+    try:
+        files = [file for file in request.files.getlist('transcripts') if file and file.filename]
+        if not files:
+            return jsonify({'error': 'No files provided'}), 400
+        if len(files) > TRANSCRIPT_JOB_MAX_FILES:
+            return jsonify({'error': f'At most {TRANSCRIPT_JOB_MAX_FILES} transcripts per job'}), 413
+
+        uploads = []
+        total = 0
+        with stage('upload'):
+            for file in files:
+                pdf_bytes = b''.join(iter_upload_chunks(file))
+                total += len(pdf_bytes)
+                if TRANSCRIPT_JOB_MAX_BYTES and total > TRANSCRIPT_JOB_MAX_BYTES:
+                    raise TranscriptParseError(
+                        f"Transcripts of one job are over the {TRANSCRIPT_JOB_MAX_BYTES} byte limit", 'too_large'
+                    )
+                uploads.append((file.filename, pdf_bytes))
+        job_id = transcript_jobs.submit(uploads)
+
+        return jsonify({'success': True, 'jobId': job_id, 'total': len(uploads)}), 202
+
+    except TranscriptParseError as e:
+        return transcript_error_response(e)
+    except Exception as e:
+        traceback.print_exc(file=sys.stderr)
+        return jsonify({'error': str(e)}), 500
+
+
+def stream_job_status(job_id):
+    """
+    NDJSON response: the job's status (without courses) every time it changes,
+    for at most JOB_STREAM_TIMEOUT seconds. It ends with the finished status,
+    a 'gone' record if the job is purged meanwhile, or a record telling the
+    client to keep polling GET /transcript-jobs/<id>.
+    """
+    json_provider = current_app.json
+
+    def generate():
+        deadline = time.monotonic() + JOB_STREAM_TIMEOUT
+        last = None
+        while True:
+            status = transcript_jobs.status(job_id)
+            if status is None:
+                # Purged by retention while being watched
+                yield json_provider.dumps({'jobId': job_id, 'status': 'gone'}) + '\n'
+                return
+            if status != last:
+                yield json_provider.dumps(status) + '\n'
+                last = status
+            if status['status'] == 'finished':
+                return
+            if time.monotonic() > deadline:
+                yield json_provider.dumps({
+                    'jobId': job_id, 'status': status['status'], 'streamClosed': True,
+                    'pollAfter': max(1, round(JOB_STREAM_INTERVAL * 4)),
+                }) + '\n'
+                return
+            time.sleep(JOB_STREAM_INTERVAL)
+
+    return current_app.response_class(stream_with_context(generate()), status=200, mimetype=NDJSON_MIMETYPE)
+
+
+@api_bp.route('/transcript-jobs/<job_id>', methods=['GET'])
+def get_transcript_job(job_id):
+    print("\n=== TRANSCRIPT JOB STATUS ROUTE CALLED ===", file=sys.stderr)
+    try:
+        status = transcript_jobs.status(job_id)
+        if status is None:
+            return jsonify({'error': 'Unknown job'}), 404
+        if request.args.get('stream') in ('1', 'true'):
+            return stream_job_status(job_id)
+        return jsonify({'success': True, **status}), 200
+
+    except Exception as e:
+        traceback.print_exc(file=sys.stderr)
+        return jsonify({'error': str(e)}), 500
+
+
+@api_bp.route('/transcript-jobs/<job_id>/results', methods=['GET'])
+def get_transcript_job_results(job_id):
+    print("\n=== TRANSCRIPT JOB RESULTS ROUTE CALLED ===", file=sys.stderr)
+    try:
+        status = transcript_jobs.status(job_id, include_courses=True)
+        if status is None:
+            return jsonify({'error': 'Unknown job'}), 404
+        # Finished files carry their courses even while the rest are still queued
+        return jsonify({'success': True, **status}), 200
+
+    except Exception as e:
+        traceback.print_exc(file=sys.stderr)
+        return jsonify({'error': str(e)}), 500
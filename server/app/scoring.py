@@ -0,0 +1,178 @@
+# --- MATCH SCORING ---
+# Every RateMyProfessor tag phrase the scorer looks at gets one bit. A
+# professor's tags string is turned into a bitmask once (when the professor
+# index is built), and a user's preferences are compiled once per request
+# into an ordered list of rules, so scoring a candidate is a few integer
+# ANDs and float adds instead of ~20 substring scans.
+
+TAG_PHRASES = (
+    'extra credit',
+    'easy grader', 'clear grading', 'graded by few things',
+    'tough grader', 'hard grader',
+    'caring', 'respected', 'inspirational', 'accessible', 'good feedback',
+    'amazing lectures', 'lecture heavy',
+    'group projects',
+    'test heavy', 'tests are tough',
+    'lots of homework', 'so many papers',
+    'attendance mandatory', 'skip class',
+    'pop quizzes',
+)
+TAG_BITS = {phrase: 1 << i for i, phrase in enumerate(TAG_PHRASES)}
+
+DEFAULT_BASE_SCORE = 2.5
+DEFAULT_DIFFICULTY = 3.0
+
+# Marker rule for the "(5.0 - difficulty) * 0.5" easy-grader bonus
+DIFFICULTY_BONUS = 'difficulty'
+
+
+def tags_mask(*phrases):
+    mask = 0
+    for phrase in phrases:
+        mask |= TAG_BITS[phrase]
+    return mask
+
+
+def professor_features(rating, difficulty, tags):
+    """
+    Precomputes (base score, difficulty, tag bitmask) for one professor, with
+    the same fallbacks the scorer has always used for missing or bad values.
+    Tags match as substrings of the lowercased tags string, as before.
+    """
+    try:
+        base_score = float(rating) if rating else DEFAULT_BASE_SCORE
+    except (TypeError, ValueError):
+        base_score = DEFAULT_BASE_SCORE
+
+    try:
+        difficulty_value = float(difficulty) if difficulty else DEFAULT_DIFFICULTY
+    except (TypeError, ValueError):
+        difficulty_value = DEFAULT_DIFFICULTY
+
+    tags_str = str(tags).lower() if tags else ""
+    mask = 0
+    for phrase, bit in TAG_BITS.items():
+        if phrase in tags_str:
+            mask |= bit
+    return base_score, difficulty_value, mask
+
+
+def compile_preferences(user_prefs):
+    """
+    Turns the preference flags into an ordered list of (any_of, none_of, delta)
+    rules. A rule adds `delta` when the professor has any tag in `any_of` and
+    none in `none_of`. Rules keep the order of the original if-chain so the
+    float sums, and therefore the rounded scores, come out identical.
+    """
+    rules = []
+
+    # A. EASY GRADER LOGIC
+    if user_prefs.get('extraCredit'):
+        rules.append((tags_mask('extra credit'), 0, 1.0))
+
+    if user_prefs.get('easyGrader') or user_prefs.get('clearGrading'):
+        # Bonus for low difficulty (1.0 difficulty = +2.0 boost)
+        rules.append(DIFFICULTY_BONUS)
+        rules.append((tags_mask('easy grader', 'clear grading', 'graded by few things'), 0, 1.0))
+        rules.append((tags_mask('tough grader', 'hard grader'), 0, -1.5))
+
+    # B. TEACHING QUALITY
+    if user_prefs.get('caring') or user_prefs.get('goodFeedback'):
+        rules.append((tags_mask('caring', 'respected', 'inspirational', 'accessible', 'good feedback'), 0, 1.2))
+
+    # C. LEARNING STYLE
+    if user_prefs.get('lectureHeavy'):
+        rules.append((tags_mask('amazing lectures'), 0, 1.5))
+        rules.append((tags_mask('lecture heavy'), tags_mask('amazing lectures'), 0.5))
+
+    if user_prefs.get('groupProjects'):
+        rules.append((tags_mask('group projects'), 0, 1.0))
+    else:
+        # User dislikes groups (default assumption)
+        rules.append((tags_mask('group projects'), 0, -0.5))
+
+    # D. "DEAL BREAKERS"
+    if not user_prefs.get('testHeavy'):
+        rules.append((tags_mask('test heavy', 'tests are tough'), 0, -1.5))
+
+    if not user_prefs.get('homeworkHeavy'):
+        rules.append((tags_mask('lots of homework', 'so many papers'), 0, -1.0))
+
+    if not user_prefs.get('strictAttendance'):
+        rules.append((tags_mask('attendance mandatory', 'skip class'), 0, -1.0))
+
+    if not user_prefs.get('popQuizzes'):
+        rules.append((tags_mask('pop quizzes'), 0, -2.0))
+
+    return rules
+
+
+def firing_rules(features, rule_bits):
+    """
+    OR of the bits (rule_bits maps compiled rules to bits) of the rules that
+    change the score of one (base score, difficulty, tag mask) tuple.
+    """
+    if features is None:
+        return 0
+    mask = features[2]
+    fired = 0
+    for rule, bit in rule_bits.items():
+        if rule is DIFFICULTY_BONUS or (mask & rule[0] and not mask & rule[1]):
+            fired |= bit
+    return fired
+
+
+def score_fired(features, bit_rules, fired):
+    """
+    score_features for one tuple whose firing rules are already known:
+    bit_rules are (bit, rule) pairs in compile_preferences order and only
+    those with their bit in `fired` are applied.
+    """
+    if features is None:
+        return 0.0
+    score, difficulty, _ = features
+    for bit, rule in bit_rules:
+        if fired & bit:
+            score += (5.0 - difficulty) * 0.5 if rule is DIFFICULTY_BONUS else rule[2]
+    return round(score, 1)
+
+
+def score_features(features, rules):
+    """Scores (base score, difficulty, tag mask) tuples against compiled rules."""
+    scores = []
+    for feature in features:
+        if feature is None:
+            scores.append(0.0)
+            continue
+        score, difficulty, mask = feature
+        for rule in rules:
+            if rule is DIFFICULTY_BONUS:
+                score += (5.0 - difficulty) * 0.5
+            elif mask & rule[0] and not mask & rule[1]:
+                score += rule[2]
+        scores.append(round(score, 1))
+    return scores
+
+
+def _features_of(professor_obj):
+    if not professor_obj:
+        return None
+    features = getattr(professor_obj, 'features', None)
+    if features is None:
+        features = professor_features(professor_obj.rating, professor_obj.difficulty, professor_obj.tags)
+    return features
+
+
+def score_professors(professors, user_prefs):
+    """
+    Batch scorer: match scores for every professor at once. Entries may be
+    None (no RateMyProfessor match), which score 0.0.
+    """
+    return score_features([_features_of(prof) for prof in professors], compile_preferences(user_prefs))
+
+
+def calculate_match_score(professor_obj, user_prefs):
+    """
+    Sophisticated scoring based on Rating, Difficulty, and Tags.
+    """
+    return score_professors([professor_obj], user_prefs)[0]
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../data/page_cache'))
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class PageCache:
+    """
+    Content-addressed on-disk store of fetched pages.
+
+    Bodies live in objects/<sha256>.html, so identical pages are stored once;
+    index.json maps each URL to its body hash plus the ETag/Last-Modified the
+    server sent, which are replayed to revalidate it next time.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+
+    def lookup(self, url):
+        """Returns (html, etag, last_modified) for a cached URL, or None."""
+        with self._lock:
+            entry = self._index.get(url)
+        if not entry:
+            return None
+        try:
+            with open(os.path.join(self.objects_dir, entry['sha256'] + '.html'), encoding='utf-8') as f:
+                return f.read(), entry.get('etag'), entry.get('last_modified')
+        except OSError:
+            return None
+
+    def store(self, url, html, etag=None, last_modified=None):
+        digest = hashlib.sha256(html.encode('utf-8')).hexdigest()
+        object_path = os.path.join(self.objects_dir, digest + '.html')
+        if not os.path.exists(object_path):
+            self._atomic_write(object_path, html)
+        with self._lock:
+            self._index[url] = {'sha256': digest, 'etag': etag, 'last_modified': last_modified}
+            self._atomic_write(self.index_path, json.dumps(self._index, indent=1, sort_keys=True))
+        return digest
+
+    def _atomic_write(self, path, text):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+class PageFetcher:
+    """
+    Fetches pages through one pooled requests.Session, at most `max_workers`
+    at a time. Cached pages are revalidated with If-None-Match /
+    If-Modified-Since; if the network is unavailable (or `offline` is set)
+    the cached copy is used as-is. Each URL is fetched at most once per fetcher.
+    """
+
+    def __init__(self, cache=None, max_workers=4, timeout=30, offline=False):
+        self.cache = cache
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.offline = offline
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._pages = {}
+        self._lock = threading.Lock()
+        self.stats = {'downloaded': 0, 'revalidated': 0, 'from_cache': 0, 'failed': 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def fetch(self, url):
+        """Returns the page body, or None if it could not be fetched or found in the cache."""
+        with self._lock:
+            if url in self._pages:
+                return self._pages[url]
+
+        cached = self.cache.lookup(url) if self.cache else None
+        html = self._fetch(url, cached)
+        with self._lock:
+            self._pages[url] = html
+        return html
+
+    def _fetch(self, url, cached):
+        if self.offline:
+            self._count('from_cache' if cached else 'failed')
+            return cached[0] if cached else None
+
+        headers = {}
+        if cached:
+            if cached[1]:
+                headers['If-None-Match'] = cached[1]
+            if cached[2]:
+                headers['If-Modified-Since'] = cached[2]
+
+        print(f"Requesting data from {url}...")
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304 and cached:
+                self._count('revalidated')
+                return cached[0]
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            if cached:
+                print(f"Error fetching URL: {e} (using cached copy)")
+                self._count('from_cache')
+                return cached[0]
+            print(f"Error fetching URL: {e}")
+            self._count('failed')
+            return None
+
+        html = response.text
+        if self.cache:
+            self.cache.store(url, html, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        self._count('downloaded')
+        return html
+
+    def fetch_many(self, urls):
+        """Fetches every URL concurrently (bounded by max_workers). Returns {url: html or None}."""
+        urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return dict(zip(urls, pool.map(self.fetch, urls)))
@@ -75,44 +75,181 @@
 # # also if you are a freshman, there might not be any grades attached to the courses
 # # also if the user has no classes, there should be an option called i'm new to UTA and we just send them to select the professor and courses attributes
 
+import io
+import os
 import pdfplumber
 import re
-from typing import List
+import sys
+import threading
+from typing import BinaryIO, List, Union
 
-def extract_all_courses(pdf_path: str) -> List[str]:
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pdfplumber normally pulls it in; fall back to the layout path
+    pdfium = None
+
+semester_course_pattern = re.compile(r'^([A-Z]{2,4}(?:-[A-Z]{2})?)\s(\d{4}).*?\d+\.\d{3}\s+\d+\.\d{3}')
+transfer_test_pattern = re.compile(
+    r'Transferred to Term \d{4} (?:Summer|Spring|Fall) as\s*\n\s*([A-Z]{3,4}\s\d{4})',
+    re.IGNORECASE
+)
+
+# PDFium is not thread-safe, so in-process calls take turns
+_pdfium_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    # A forked child (the transcript sandbox) can inherit the lock while
+    # another thread holds it; start it with a fresh one
+    global _pdfium_lock
+    _pdfium_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class TranscriptParseError(Exception):
     """
-    Parses a UTA Unofficial Civil Engineering Undergrad transcript PDF to find all course codes.
+    A transcript that could not be turned into a course list. `reason` is a
+    short code the API hands back: unreadable, too_large, too_many_pages,
+    timeout, memory or crashed.
+    """
+
+    def __init__(self, message, reason='unreadable'):
+        super().__init__(message)
+        self.reason = reason
+
+    def __reduce__(self):
+        # Keep the reason when the error crosses a process boundary
+        return type(self), (str(self), self.reason)
+
+
+def find_courses_in_text(text: str, found_courses_set: set) -> None:
+    """Adds every course code the transcript patterns match in one page of text."""
+    if not text:
+        return
+
+    for course_code in transfer_test_pattern.findall(text):
+        found_courses_set.add(course_code)
+
+    for line in text.split('\n'):
+        match = semester_course_pattern.match(line.strip())
+        if match:
+            found_courses_set.add(f"{match.group(1)} {match.group(2)}")
+
+
+def _open_source(source):
+    """Paths and bytes as they are; a file object rewound, since every open reads it from the start."""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    if not isinstance(source, str):
+        source.seek(0)
+    return source
+
+
+def _pdfium_page_texts(source, start=0, stop=None) -> List[str]:
+    """Raw text of each page via PDFium; fast, but without layout analysis."""
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(_open_source(source))
+        try:
+            stop = len(pdf) if stop is None else stop
+            texts = []
+            for i in range(start, stop):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_bounded().replace('\r\n', '\n').replace('\r', '\n'))
+                textpage.close()
+                page.close()
+            return texts
+        finally:
+            pdf.close()
+
+
+def _pdfplumber_page_texts(source, start=0, stop=None) -> List[str]:
+    """Layout-aware text of each page via pdfplumber; slower, but the original path."""
+    with pdfplumber.open(_open_source(source)) as pdf:
+        return [page.extract_text(x_tolerance=2, y_tolerance=3) for page in pdf.pages[start:stop]]
+
+
+def _page_count(backend: str, source) -> int:
+    if backend == 'pdfium':
+        with _pdfium_lock:
+            pdf = pdfium.PdfDocument(_open_source(source))
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+    with pdfplumber.open(_open_source(source)) as pdf:
+        return len(pdf.pages)
+
+
+# Fastest first; later backends only run when the earlier ones find no courses
+EXTRACTION_BACKENDS = {
+    'pdfium': _pdfium_page_texts,
+    'pdfplumber': _pdfplumber_page_texts,
+}
+
+
+def _extract_with_backend(backend: str, source, max_pages: int = None) -> set:
+    page_count = _page_count(backend, source)
+    if max_pages and page_count > max_pages:
+        raise TranscriptParseError(
+            f"Transcript has {page_count} pages; at most {max_pages} are accepted", 'too_many_pages'
+        )
+    found_courses_set = set()
+    for text in EXTRACTION_BACKENDS[backend](source, 0, page_count):
+        find_courses_in_text(text, found_courses_set)
+    return found_courses_set
+
+
+def parse_courses(pdf_path: Union[str, bytes, BinaryIO], backends: List[str] = None,
+                  max_pages: int = None) -> List[str]:
+    """
+    Like extract_all_courses, but raises TranscriptParseError instead of
+    returning [] when no backend can read the PDF or it has more than
+    `max_pages` pages.
     """
-    semester_course_pattern = re.compile(r'^([A-Z]{2,4}(?:-[A-Z]{2})?)\s(\d{4}).*?\d+\.\d{3}\s+\d+\.\d{3}')
-    transfer_test_pattern = re.compile(
-        r'Transferred to Term \d{4} (?:Summer|Spring|Fall) as\s*\n\s*([A-Z]{3,4}\s\d{4})',
-        re.IGNORECASE
-    )
+    if backends is None:
+        backends = [name for name in EXTRACTION_BACKENDS if name != 'pdfium' or pdfium is not None]
 
+    source = pdf_path
     found_courses_set = set()
-    
+    error = None
+
+    for backend in backends:
+        try:
+            found_courses_set = _extract_with_backend(backend, source, max_pages)
+        except TranscriptParseError:
+            raise
+        except Exception as e:
+            # A PDF one library chokes on may still open in the next
+            error = e
+            continue
+        if found_courses_set:
+            break
+
+    if not found_courses_set and error is not None:
+        raise TranscriptParseError(f"Could not read the transcript PDF: {error}") from error
+
+    return sorted(found_courses_set)
+
+
+def extract_all_courses(pdf_path: Union[str, bytes, BinaryIO], backends: List[str] = None) -> List[str]:
+    """
+    Parses a UTA Unofficial Civil Engineering Undergrad transcript PDF to find all course codes.
+    Accepts a file path, the PDF bytes, or a seekable binary file object (e.g. an upload stream).
+
+    Text comes from the first backend in `backends` (default: PDFium raw text,
+    then pdfplumber's layout-aware extraction) whose text the course patterns match.
+    Returns [] if the PDF can't be read; parse_courses raises the error instead.
+    """
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text(x_tolerance=2, y_tolerance=3)
-                if not text:
-                    continue
-                
-                for course_code in transfer_test_pattern.findall(text):
-                    found_courses_set.add(course_code)
-                
-                for line in text.split('\n'):
-                    match = semester_course_pattern.match(line.strip())
-                    if match:
-                        found_courses_set.add(f"{match.group(1)} {match.group(2)}")
-                        
-    except Exception as e:
-        print(f"Error parsing PDF: {e}")
+        return parse_courses(pdf_path, backends)
+    except TranscriptParseError as e:
+        print(f"Error parsing PDF: {e.__cause__ or e}")
         return []
 
-    unique_courses = sorted(list(found_courses_set))
-    return unique_courses
-
 # --- Main execution block ---
 if __name__ == "__main__":
     if len(sys.argv) > 1:
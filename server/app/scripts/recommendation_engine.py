@@ -1,100 +1,566 @@
 import os
+import re
+import sys
 import sqlite3
+import threading
 from .parse_transcript import extract_all_courses 
 
-def get_department_courses(department):
+# Called with every SQL statement run against classes.db / grades.sqlite;
+# the API points it at its per-request query counter
+query_listener = None
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path)
+    if query_listener is not None:
+        conn.set_trace_callback(query_listener)
+    return conn
+
+def get_data_dir():
+    # DATA_DIR points the API at another set of databases (e.g. benchmark data)
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    db_path = os.path.abspath(os.path.join(script_dir, '../../../data/classes.db'))
+    return os.path.abspath(os.getenv('DATA_DIR') or os.path.join(script_dir, '../../../data'))
+
+def get_classes_db_path():
+    db_path = os.path.join(get_data_dir(), 'classes.db')
     if not os.path.exists(db_path):
         raise FileNotFoundError(f"Database file not found at {db_path}")
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute(f'SELECT * FROM ClassesFor{department}')
-    rows = cur.fetchall()
-    columns = [desc[0] for desc in cur.description]
-    courses = [dict(zip(columns, row)) for row in rows]
-    conn.close()
-    return courses
+    return db_path
+
+class CourseRecord:
+    """
+    One read-only catalog row. Reads like the old row dict (course['Course_Name'],
+    course.get('Pre_Requisites')), but uses __slots__ and leaves the long
+    Description column in the database until something asks for it.
+    """
+    __slots__ = ('Course_Num', 'Course_Name', 'Pre_Requisites', 'Co_Requisites', '_table', '_description')
+    COLUMNS = ('Course_Num', 'Course_Name', 'Pre_Requisites', 'Co_Requisites', 'Description')
+
+    def __init__(self, table, course_num, course_name, pre_requisites, co_requisites):
+        self._table = table
+        self.Course_Num = course_num
+        self.Course_Name = course_name
+        self.Pre_Requisites = pre_requisites
+        self.Co_Requisites = co_requisites
+        self._description = None
+
+    @property
+    def Description(self):
+        if self._description is None:
+            conn = _connect(get_classes_db_path())
+            try:
+                row = conn.execute(
+                    f'SELECT Description FROM {self._table} WHERE Course_Num = ?', (self.Course_Num,)
+                ).fetchone()
+            finally:
+                conn.close()
+            self._description = (row[0] if row else None) or ''
+        return self._description
+
+    def __getitem__(self, key):
+        if key not in self.COLUMNS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.COLUMNS else default
+
+    def keys(self):
+        return self.COLUMNS
+
+    def __repr__(self):
+        return f"<CourseRecord {self.Course_Num}>"
+
+_catalog_lock = threading.Lock()
+_catalog_cache = {}
+
+def get_department_table(department):
+    # Sanitize department name for table name (same rule the scraper uses)
+    return re.sub(r'[^a-zA-Z0-9_]', '', f"ClassesFor{department}")
+
+def _classes_db_version():
+    # The scraper writes in WAL mode, so a refresh lands in classes.db-wal and
+    # only reaches classes.db at checkpoint; either file changing is a new version
+    db_path = get_classes_db_path()
+    try:
+        wal_version = os.stat(db_path + '-wal').st_mtime_ns
+    except FileNotFoundError:
+        wal_version = None
+    return db_path, (db_path, os.stat(db_path).st_mtime_ns, wal_version)
+
+def get_department_courses(department):
+    """
+    Returns the department's catalog as a tuple of CourseRecords. Catalogs are
+    loaded once and shared; they reload only when classes.db changes on disk.
+    """
+    db_path, version = _classes_db_version()
+    cached = _catalog_cache.get(department)
+    if cached and cached[0] == version:
+        return cached[1]
+    with _catalog_lock:
+        cached = _catalog_cache.get(department)
+        if cached and cached[0] == version:
+            return cached[1]
+        table = get_department_table(department)
+        conn = _connect(db_path)
+        try:
+            cur = conn.cursor()
+            cur.execute(f'SELECT Course_Num, Course_Name, Pre_Requisites, Co_Requisites FROM {table}')
+            courses = tuple(CourseRecord(table, *row) for row in cur.fetchall())
+        finally:
+            conn.close()
+        _catalog_cache[department] = (version, courses)
+        return courses
+
+def list_departments():
+    """Departments that have a ClassesFor{dept} table in classes.db."""
+    conn = _connect(get_classes_db_path())
+    try:
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'ClassesFor%'"
+        ).fetchall()
+    finally:
+        conn.close()
+    return [row[0][len('ClassesFor'):] for row in rows]
+
+def warm_catalog_cache():
+    """Preloads every department catalog and its prerequisite graph (run at app start)."""
+    departments = list_departments()
+    for department in departments:
+        get_prerequisite_graph(department)
+    return departments
 
 def normalize_code(course_code):
     return ' '.join(str(course_code).replace('\xa0', ' ').split()).strip()
 
-def is_course_eligible(course, completed, course_map):
-    course_id = normalize_code(course['Course_Num'])
-    prereqs = course.get('Pre_Requisites', '').strip()
-    if prereqs and prereqs.lower() != 'none':
-        prereq_list = [normalize_code(p) for p in prereqs.split(',') if p.strip()]
-        for p in prereq_list:
-            if p not in completed:
-                return False
-    coreqs = course.get('Co_Requisites', '').strip()
-    if coreqs and coreqs.lower() != 'none':
-        coreq_list = [normalize_code(p) for p in coreqs.split(',') if p.strip()]
-        for ccode in coreq_list:
-            if ccode in completed:
+def split_requisites(requisites):
+    """
+    Splits a Pre_Requisites/Co_Requisites string into clauses of normalized
+    course codes. "," means AND and "|" means OR, so "CSE 2320, MATH 3133|IE 3301"
+    becomes [['CSE 2320'], ['MATH 3133', 'IE 3301']].
+    """
+    requisites = (requisites or '').strip()
+    if not requisites or requisites.lower() == 'none':
+        return []
+    clauses = []
+    for part in requisites.split(','):
+        options = [normalize_code(p) for p in part.split('|') if p.strip()]
+        if options:
+            clauses.append(options)
+    return clauses
+
+def _bit_positions(mask):
+    """Positions of the set bits of an int, lowest first."""
+    if mask.bit_count() * 4 > mask.bit_length():
+        # Dense: scanning the binary digits beats peeling off one bit at a time
+        return [i for i, bit in enumerate(bin(mask)[:1:-1]) if bit == '1']
+    positions = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
+
+
+class PrerequisiteGraph:
+    """
+    Prerequisite/co-requisite graph compiled from one ClassesFor{dept} table.
+
+    Course codes are interned to bit positions and every requirement string
+    is compiled once into an AND of OR-clauses, each clause an int bitmask of
+    its alternatives. A completed-course set becomes one bitmask too, so a
+    clause is met when `clause & completed` is non-zero and checking a whole
+    set is a single pass over the courses. Graphs are read-only once built
+    and are shared between requests and threads.
+    """
+
+    def __init__(self, courses):
+        self.ids = {}
+        self.codes = []
+        # (course id, row) in table order, the position of each id's first
+        # row, and the row kept for each id (last wins)
+        self.rows = []
+        self.first_row = {}
+        self.course_map = {}
+        self.prereqs = {}
+        self.coreqs = {}
+        self.coreq_options = {}
+        for course in courses:
+            c_id = self.intern(course['Course_Num'])
+            self.first_row.setdefault(c_id, len(self.rows))
+            self.rows.append((c_id, course))
+            self.course_map[c_id] = course
+        for c_id, course in self.course_map.items():
+            self.prereqs[c_id] = self.compile(course.get('Pre_Requisites'))
+            self.coreqs[c_id] = self.compile(course.get('Co_Requisites'))
+            self.coreq_options[c_id] = tuple(
+                self.ids[code] for clause in split_requisites(course.get('Co_Requisites')) for code in clause
+            )
+
+    def intern(self, course_code):
+        code = normalize_code(course_code)
+        c_id = self.ids.get(code)
+        if c_id is None:
+            c_id = self.ids[code] = len(self.codes)
+            self.codes.append(code)
+        return c_id
+
+    def compile(self, requisites):
+        """Compiles a requisite string into a tuple of OR-clause bitmasks."""
+        clauses = []
+        for options in split_requisites(requisites):
+            mask = 0
+            for code in options:
+                mask |= 1 << self.intern(code)
+            clauses.append(mask)
+        return tuple(clauses)
+
+    def completed_mask(self, completed_courses):
+        """Bitset of the completed courses this graph knows about; others cannot matter."""
+        ids = self.ids
+        mask = 0
+        for code in completed_courses:
+            # Codes usually arrive normalized already; normalizing is the slow part
+            c_id = ids.get(code) if isinstance(code, str) else None
+            if c_id is None:
+                c_id = ids.get(normalize_code(code))
+            if c_id is not None:
+                mask |= 1 << c_id
+        return mask
+
+    def eligible(self, completed_courses):
+        """
+        Returns {course_code: course} for every course not yet taken whose
+        prerequisites are met and whose co-requisites are either taken or can
+        be taken alongside it, in table order, each followed by its co-requisites.
+        """
+        return self.eligible_for_mask(self.completed_mask(completed_courses))
+
+    def eligible_many(self, completed_lists):
+        """
+        eligible() for many students at once, evaluating every requirement
+        clause once for the whole cohort: each course gets a bitset of the
+        students (one bit per distinct completed set) who have taken it, meet
+        its prerequisites or can take it, so the clause work does not grow
+        with the number of students. Students who end up with the same
+        eligible courses share one (read-only) result dict.
+        """
+        masks = [self.completed_mask(completed_courses) for completed_courses in completed_lists]
+        students = list(dict.fromkeys(masks))
+        everyone = (1 << len(students)) - 1
+
+        taken = [0] * len(self.codes)
+        for student, mask in enumerate(students):
+            for c_id in _bit_positions(mask):
+                taken[c_id] |= 1 << student
+
+        clause_ids = {}
+
+        def meeting(clauses, have):
+            # Students for whom every clause has at least one alternative in `have`
+            met = everyone
+            for clause in clauses:
+                ids = clause_ids.get(clause)
+                if ids is None:
+                    ids = clause_ids[clause] = _bit_positions(clause)
+                any_of = 0
+                for c_id in ids:
+                    any_of |= have[c_id]
+                met &= any_of
+                if not met:
+                    break
+            return met
+
+        prereqs_met = {c_id: meeting(clauses, taken) for c_id, clauses in self.prereqs.items()}
+        takeable = list(taken)
+        for c_id, met in prereqs_met.items():
+            takeable[c_id] |= met
+
+        eligible_masks = [0] * len(students)
+        for c_id, met in prereqs_met.items():
+            if met:
+                met &= meeting(self.coreqs[c_id], takeable) & ~taken[c_id]
+            for student in _bit_positions(met):
+                eligible_masks[student] |= 1 << c_id
+
+        by_mask = {}
+        for student, eligible_mask in enumerate(eligible_masks):
+            if eligible_mask not in by_mask:
+                by_mask[eligible_mask] = self.eligible_in_order(eligible_mask)
+            eligible_masks[student] = by_mask[eligible_mask]
+        by_student = dict(zip(students, eligible_masks))
+        return [by_student[mask] for mask in masks]
+
+    def eligible_in_order(self, eligible_mask):
+        """The courses in a bitset of eligible ones, ordered as eligible() orders them."""
+        eligible = dict()
+        added = 0
+        # Only eligible courses can be added, so visit just their first rows
+        for c_id in sorted(_bit_positions(eligible_mask), key=self.first_row.__getitem__):
+            if added >> c_id & 1:
                 continue
-            co_course = course_map.get(ccode)
-            if not co_course:
+            eligible[self.codes[c_id]] = self.rows[self.first_row[c_id]][1]
+            added |= 1 << c_id
+            for cc in self.coreq_options[c_id]:
+                if eligible_mask >> cc & 1 and not added >> cc & 1 and cc in self.course_map:
+                    eligible[self.codes[cc]] = self.course_map[cc]
+                    added |= 1 << cc
+        return eligible
+
+    def eligible_for_mask(self, completed):
+        # Courses whose own prerequisites are met; with `completed` these are
+        # the courses that satisfy a co-requisite clause
+        takeable = completed
+        for c_id, clauses in self.prereqs.items():
+            if all(clause & completed for clause in clauses):
+                takeable |= 1 << c_id
+
+        def can_take(c_id):
+            if not all(clause & completed for clause in self.prereqs[c_id]):
                 return False
-            co_prereqs = co_course.get('Pre_Requisites', '').strip()
-            if co_prereqs and co_prereqs.lower() != 'none':
-                co_prereq_list = [normalize_code(p) for p in co_prereqs.split(',') if p.strip()]
-                for p in co_prereq_list:
-                    if p not in completed:
-                        return False
-    return True
+            return all(clause & takeable for clause in self.coreqs[c_id])
+
+        eligible = dict()
+        added = completed
+        for c_id, course in self.rows:
+            if added >> c_id & 1:
+                continue
+            if can_take(c_id):
+                eligible[self.codes[c_id]] = course
+                added |= 1 << c_id
+                for cc in self.coreq_options[c_id]:
+                    if not added >> cc & 1 and cc in self.course_map and can_take(cc):
+                        eligible[self.codes[cc]] = self.course_map[cc]
+                        added |= 1 << cc
+        return eligible
+
+_graph_lock = threading.Lock()
+_graph_cache = {}
+
+def get_prerequisite_graph(department):
+    """
+    Returns the compiled PrerequisiteGraph for a department. It is compiled
+    from the cached catalog and recompiled only when that catalog reloads.
+    """
+    courses = get_department_courses(department)
+    cached = _graph_cache.get(department)
+    if cached and cached[0] is courses:
+        return cached[1]
+    with _graph_lock:
+        cached = _graph_cache.get(department)
+        if cached and cached[0] is courses:
+            return cached[1]
+        graph = PrerequisiteGraph(courses)
+        _graph_cache[department] = (courses, graph)
+        return graph
 
 def filter_eligible_courses_unique(all_courses, completed_courses):
-    normalized_completed = set(normalize_code(c) for c in completed_courses)
-    eligible = dict()
-    course_map = {normalize_code(c['Course_Num']): c for c in all_courses}
-    for course in all_courses:
-        c_id = normalize_code(course['Course_Num'])
-        if c_id in normalized_completed or c_id in eligible:
-            continue
-        if is_course_eligible(course, normalized_completed, course_map):
-            eligible[c_id] = course
-            coreqs = course.get('Co_Requisites', '').strip()
-            if coreqs and coreqs.lower() != 'none':
-                coreq_list = [normalize_code(cc) for cc in coreqs.split(',') if cc.strip()]
-                for ccode in coreq_list:
-                    if ccode not in normalized_completed and ccode in course_map and ccode not in eligible:
-                        co_course = course_map[ccode]
-                        if is_course_eligible(co_course, normalized_completed, course_map):
-                            eligible[ccode] = co_course
-    return eligible
+    return PrerequisiteGraph(all_courses).eligible(completed_courses)
 
-def get_professor_offerings_for_course(course_code):
-    # Looks in all tables for offerings of the given course code (subject_id + course_number)
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    db_path = os.path.abspath(os.path.join(script_dir, '../../../data/grades.sqlite'))
+OFFERING_COLUMNS = (
+    'subject_id', 'course_number', 'course_title', 'year', 'semester',
+    'instructor1', 'instructor2', 'instructor3', 'instructor4', 'instructor5', 'course_gpa'
+)
+# Tables we create inside grades.sqlite; everything else is a term table
+OFFERINGS_TABLE = 'offerings'
+OFFERINGS_SOURCES_TABLE = 'offerings_sources'
+# SQLite caps bound parameters per statement; two per course code
+OFFERINGS_BATCH_SIZE = 400
+
+_offerings_lock = threading.Lock()
+# ((db_path, mtime), offerings table is current)
+_offerings_checked = None
+
+def get_grades_db_path():
+    db_path = os.path.join(get_data_dir(), 'grades.sqlite')
     if not os.path.exists(db_path):
         raise FileNotFoundError(f"Grades DB file not found at {db_path}")
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
+    return db_path
+
+def _list_term_tables(cur):
     cur.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = [row[0] for row in cur.fetchall() if not row[0].startswith('sqlite')] # skip any sqlite internal tables
-    offerings = []
-    subj, num = course_code.split()
-    for tbl in tables:
-        safe_tbl = f'"{tbl}"' if ('-' in tbl or ' ' in tbl) else tbl
+    return [
+        row[0] for row in cur.fetchall()
+        if not row[0].startswith('sqlite') and row[0] not in (OFFERINGS_TABLE, OFFERINGS_SOURCES_TABLE)
+    ]
+
+def _table_stamp(cur, tbl):
+    """(row count, max rowid) of a term table; either changes when rows are added or removed."""
+    cur.execute(f'SELECT count(*), max(rowid) FROM {_quote(tbl)}')
+    return tuple(cur.fetchone())
+
+def _has_offering_columns(cur, tbl):
+    cur.execute('SELECT name FROM pragma_table_info(?)', (tbl,))
+    return set(OFFERING_COLUMNS).issubset(row[0] for row in cur.fetchall())
+
+def consolidate_grade_tables(db_path=None):
+    """
+    Ingestion step: copies every term table in grades.sqlite into a single
+    `offerings` table with a (subject_id, course_number) index, so looking up
+    a course is one indexed query instead of one query per term table.
+    Rows keep the old table-then-row order so the first term listed for a
+    professor does not change. Run it after loading new term tables:
+
+        python -m app.scripts.recommendation_engine --consolidate
+
+    The rebuild happens in one IMMEDIATE transaction, so readers see either
+    the old offerings table or the new one, never a half-built one.
+    """
+    db_path = db_path or get_grades_db_path()
+    conn = _connect(db_path)
+    conn.isolation_level = None  # we manage the transaction
+    try:
+        cur = conn.cursor()
+        cur.execute('BEGIN IMMEDIATE')
+        try:
+            tables = _list_term_tables(cur)
+            cur.execute(f'DROP TABLE IF EXISTS {OFFERINGS_TABLE}')
+            cur.execute(f'''CREATE TABLE {OFFERINGS_TABLE} (
+                                source_table TEXT NOT NULL,
+                                subject_id TEXT,
+                                course_number TEXT,
+                                course_title TEXT,
+                                year,
+                                semester,
+                                instructor1 TEXT,
+                                instructor2 TEXT,
+                                instructor3 TEXT,
+                                instructor4 TEXT,
+                                instructor5 TEXT,
+                                course_gpa
+                                )''')
+            cur.execute(f'DROP TABLE IF EXISTS {OFFERINGS_SOURCES_TABLE}')
+            cur.execute(f'''CREATE TABLE {OFFERINGS_SOURCES_TABLE} (
+                                table_name TEXT PRIMARY KEY,
+                                row_count INTEGER NOT NULL,
+                                max_rowid INTEGER
+                                )''')
+
+            columns = ', '.join(OFFERING_COLUMNS)
+            select_columns = ', '.join(
+                f'CAST({col} AS TEXT)' if col in ('subject_id', 'course_number') else col
+                for col in OFFERING_COLUMNS
+            )
+            for tbl in tables:
+                if not _has_offering_columns(cur, tbl):
+                    # Not a term table; the old per-table scan skipped these too
+                    continue
+                cur.execute(
+                    f'INSERT INTO {OFFERINGS_TABLE} (source_table, {columns}) '
+                    f'SELECT ?, {select_columns} FROM {_quote(tbl)}',
+                    (tbl,)
+                )
+                cur.execute(
+                    f'INSERT INTO {OFFERINGS_SOURCES_TABLE} (table_name, row_count, max_rowid) VALUES (?, ?, ?)',
+                    (tbl, *_table_stamp(cur, tbl))
+                )
+
+            cur.execute(f'CREATE INDEX idx_offerings_course ON {OFFERINGS_TABLE} (subject_id, course_number)')
+            cur.execute('COMMIT')
+        except BaseException:
+            cur.execute('ROLLBACK')
+            raise
+    finally:
+        conn.close()
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def _offerings_table_current(db_path):
+    """
+    True when the offerings table covers exactly the current term tables,
+    with the row count and max rowid each had when it was copied. Read-only: a missing or stale table is reported, never rebuilt here.
+    """
+    global _offerings_checked
+    mtime = (db_path, os.path.getmtime(db_path))
+    if _offerings_checked and _offerings_checked[0] == mtime:
+        return _offerings_checked[1]
+    with _offerings_lock:
+        conn = _connect(db_path)
         try:
-            cur.execute(f'SELECT subject_id, course_number, course_title, year, semester, instructor1, instructor2, instructor3, instructor4, instructor5, course_gpa FROM {safe_tbl} WHERE subject_id=? AND course_number=?', (subj, num))
-            for row in cur.fetchall():
-                offerings.append({
+            cur = conn.cursor()
+            term_tables = {
+                tbl: _table_stamp(cur, tbl) for tbl in _list_term_tables(cur) if _has_offering_columns(cur, tbl)
+            }
+            try:
+                cur.execute(f'SELECT table_name, row_count, max_rowid FROM {OFFERINGS_SOURCES_TABLE}')
+                current = {row[0]: tuple(row[1:]) for row in cur.fetchall()} == term_tables
+            except sqlite3.OperationalError:
+                current = False
+        finally:
+            conn.close()
+        if not current:
+            print(f"Warning: offerings table in {db_path} is missing or stale; reading term tables "
+                  f"directly. Run consolidate_grade_tables() to rebuild it.")
+        _offerings_checked = (mtime, current)
+        return current
+
+def get_data_version():
+    """(classes.db, grades.sqlite) paths and modification times; changes whenever either is rewritten."""
+    grades_path = get_grades_db_path()
+    return _classes_db_version()[1], (grades_path, os.stat(grades_path).st_mtime_ns)
+
+def _offering_queries(cur, table, keys):
+    """
+    Yields the rows of `table` for the (subject, number) keys, in rowid order
+    per subject. Codes are grouped by subject so every lookup is an
+    `subject_id = ? AND course_number IN (...)` probe of the course index.
+    """
+    by_subject = {}
+    for subject, number in keys:
+        by_subject.setdefault(subject, []).append(number)
+    for subject, numbers in by_subject.items():
+        for start in range(0, len(numbers), OFFERINGS_BATCH_SIZE):
+            batch = numbers[start:start + OFFERINGS_BATCH_SIZE]
+            cur.execute(
+                f'SELECT {", ".join(OFFERING_COLUMNS)} FROM {table} '
+                f'WHERE subject_id = ? AND course_number IN ({", ".join(["?"] * len(batch))}) ORDER BY rowid',
+                [subject, *batch]
+            )
+            yield from cur.fetchall()
+
+def get_offerings_for_courses(course_codes):
+    """
+    Fetches the offerings of every given course (subject_id + course_number)
+    from the consolidated offerings table, with one indexed query per
+    subject (and batch). Returns {course_code: [offering, ...]}, with an
+    empty list for codes that were never offered. If the offerings table is
+    missing or stale the term tables are read directly instead.
+    """
+    db_path = get_grades_db_path()
+
+    offerings = {code: [] for code in course_codes}
+    keys = {}
+    for code in offerings:
+        parts = str(code).split()
+        if len(parts) == 2:
+            keys[(parts[0], parts[1])] = code
+
+    conn = _connect(db_path)
+    try:
+        cur = conn.cursor()
+        if _offerings_table_current(db_path):
+            tables = [OFFERINGS_TABLE]
+        else:
+            tables = [_quote(tbl) for tbl in _list_term_tables(cur) if _has_offering_columns(cur, tbl)]
+        for table in tables:
+            for row in _offering_queries(cur, table, list(keys)):
+                offerings[keys[(str(row[0]), str(row[1]))]].append({
                     'subject_id': row[0],
                     'course_number': row[1],
                     'course_title': row[2],
                     'year': row[3],
                     'semester': row[4],
-                    'course_gpa': row[9],
+                    'course_gpa': row[10],
                     'instructors': [iname for iname in row[5:10] if iname and str(iname).strip() and str(iname).strip().lower() != 'none']
                 })
-        except Exception:
-            continue
-    conn.close()
+    finally:
+        conn.close()
     return offerings
 
+def get_professor_offerings_for_course(course_code):
+    # Single-course wrapper around the batched lookup
+    return get_offerings_for_courses([course_code])[course_code]
+
 def print_prof_recs_for_course(course_code, course_name, completed):
     offerings = get_professor_offerings_for_course(course_code)
     seen = set()
@@ -135,22 +601,33 @@ def run_local_demo():
     
     for code, e in list(eligible.items()):
         print(f"{code}: {e['Course_Name']}")
-        co_req = e.get('Co_Requisites', '').strip()
-        if co_req and co_req.lower() != 'none':
-            co_req_list = [normalize_code(c) for c in co_req.split(',') if c.strip()]
-            remaining_coreqs = [c for c in co_req_list if c not in completed]
-            if remaining_coreqs:
-                print(f"    Co-requisite(s): {', '.join(remaining_coreqs)}")
+        remaining_coreqs = [
+            '|'.join(clause) for clause in split_requisites(e.get('Co_Requisites'))
+            if not any(c in completed for c in clause)
+        ]
+        if remaining_coreqs:
+            print(f"    Co-requisite(s): {', '.join(remaining_coreqs)}")
         print_prof_recs_for_course(code, e['Course_Name'], completed)
 
 if __name__ == "__main__":
-    run_local_demo()
+    if '--consolidate' in sys.argv[1:]:
+        consolidate_grade_tables()
+        print(f"Consolidated term tables into {OFFERINGS_TABLE} in {get_grades_db_path()}")
+    else:
+        run_local_demo()
 
 # Export functions for API use
 __all__ = [
     'get_department_courses',
+    'list_departments',
+    'warm_catalog_cache',
     'filter_eligible_courses_unique', 
+    'get_prerequisite_graph',
+    'PrerequisiteGraph',
     'get_professor_offerings_for_course',
+    'get_offerings_for_courses',
+    'consolidate_grade_tables',
+    'get_data_version',
     'extract_all_courses',
     'normalize_code'
 ]
@@ -1,25 +1,60 @@
 # Complete Web Scraper with OR Prerequisite Logic
 
 from bs4 import BeautifulSoup
-import requests
+import hashlib
+import os
 import re
 import sqlite3
-import spacy
 
-
-# --- Load spaCy Model Globally ---
 try:
-    nlp = spacy.load("en_core_web_lg")
-except OSError:
-    print("Downloading spaCy model 'en_core_web_lg'...")
-    print("This may take a minute and only needs to run once.")
-    spacy.cli.download("en_core_web_lg")
-    nlp = spacy.load("en_core_web_lg")
+    from .page_cache import DEFAULT_CACHE_DIR, PageCache, PageFetcher
+except ImportError:  # run directly as a script
+    from page_cache import DEFAULT_CACHE_DIR, PageCache, PageFetcher
+
+
+# Only sentence boundaries are used, which come from the parser (and the
+# tok2vec layer it listens to); the rest of the pipeline is dead weight
+UNUSED_PIPES = ["tagger", "attribute_ruler", "lemmatizer", "ner"]
+
+# spaCy model used for sentence splitting; override with SCRAPER_SPACY_MODEL
+SPACY_MODEL = os.environ.get("SCRAPER_SPACY_MODEL", "en_core_web_lg")
+
+# nlp.pipe settings for batched requisite extraction
+NLP_BATCH_SIZE = int(os.environ.get("SCRAPER_NLP_BATCH_SIZE", 64))
+NLP_PROCESSES = int(os.environ.get("SCRAPER_NLP_PROCESSES", 1))
+
+# (model, excluded pipes) -> loaded pipeline, or None if the model is missing
+_nlp_models = {}
+
+
+def get_nlp(model=None, exclude=None):
+    """
+    Load the spaCy pipeline on first use instead of at import.
+    Returns None when spaCy or the model is not installed, in which case
+    requisites are extracted with the regex sentence splitter instead.
+    Install the model with: python -m spacy download en_core_web_lg
+    """
+    model = model or SPACY_MODEL
+    exclude = tuple(UNUSED_PIPES if exclude is None else exclude)
+    key = (model, exclude)
+    if key not in _nlp_models:
+        try:
+            import spacy
+            _nlp_models[key] = spacy.load(model, exclude=list(exclude))
+        except (ImportError, OSError):
+            print(f"Warning: spaCy model '{model}' is not installed; "
+                  "falling back to regex sentence splitting.")
+            _nlp_models[key] = None
+    return _nlp_models[key]
 
 
 # Regex to find course codes (e.g., CEE 1234, MATH 2425)
 COURSE_RE = re.compile(r'([A-Z]{2,4})\s(\d{4})')
 
+# Sentence boundary for the regex fallback: end punctuation, whitespace,
+# then something that starts a sentence
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z(])')
+
 
 # --- NEW FUNCTION: Format Prerequisites with OR Logic ---
 def format_prerequisites_with_or_logic(prereqs_set, description_text):
@@ -60,14 +95,11 @@ def format_prerequisites_with_or_logic(prereqs_set, description_text):
 
 
 # --- Requisite Extraction Function (State Machine) ---
-def extract_requisites(description_text):
+def requisite_block(description_text):
     """
-    Uses spaCy to parse the entire requisite block
-    and uses a state machine to categorize courses.
+    Returns (block_text, starting_mode) for the requisite part of a description,
+    or None if it mentions no requisites. Mode 0 = prerequisite, 1 = corequisite.
     """
-    prereqs = set()
-    coreqs = set()
-
     # --- Step 1: Find the start of the entire requisite block ---
     lower_text = description_text.lower()
     
@@ -83,39 +115,40 @@ def extract_requisites(description_text):
     
     if not valid_indices:
         # No requisite keywords found at all in the description
-        return {"prereqs": prereqs, "coreqs": coreqs}
+        return None
     
     # Get the index of the first keyword
     start_index = min(valid_indices)
-    
-    # Extract the entire block of text from that point forward
-    req_block_text = description_text[start_index:]
-    # --- End Step 1 ---
 
-    # --- Step 2: Process this block with spaCy ---
-    doc = nlp(req_block_text)
-    
-    # --- Step 3: Track the "state" as we read sentences ---
-    # 0 = prerequisite mode (default)
-    # 1 = corequisite mode
-    current_mode = 0 
-    
     # Set default mode based on the *first* keyword found
+    current_mode = 0
     first_keyword = lower_text[start_index:start_index+20]
     if "corequisite" in first_keyword or "concurrent" in first_keyword:
         current_mode = 1
-    
-    for sent in doc.sents:
-        sent_text = sent.text.lower()
+
+    # Extract the entire block of text from that point forward
+    return description_text[start_index:], current_mode
+
+
+def classify_sentences(sentences, current_mode):
+    """
+    Uses a state machine over the sentences of a requisite block
+    to categorize the courses it mentions.
+    """
+    prereqs = set()
+    coreqs = set()
+
+    for sent_text in sentences:
+        lowered = sent_text.lower()
         
         # Check for keywords to *change* the state
-        if "corequisite" in sent_text or "concurrent" in sent_text:
+        if "corequisite" in lowered or "concurrent" in lowered:
             current_mode = 1  # Now we are in coreq mode
-        elif "prerequisite" in sent_text:
+        elif "prerequisite" in lowered:
             current_mode = 0  # Now we are in prereq mode
             
         # Find all course codes in this sentence
-        found_codes = COURSE_RE.findall(sent.text)
+        found_codes = COURSE_RE.findall(sent_text)
         if not found_codes:
             continue
             
@@ -130,16 +163,74 @@ def extract_requisites(description_text):
     return {"prereqs": prereqs, "coreqs": coreqs}
 
 
-def find_data(html_content):
+def split_sentences(text):
+    """Regex sentence splitter used when no spaCy model is available."""
+    return [sent for sent in SENTENCE_END_RE.split(text.strip()) if sent]
+
+
+# description text -> extracted requisites; catalog pages repeat boilerplate
+# descriptions and the same page is often parsed more than once per run
+_requisite_memo = {}
+
+
+def _copy_reqs(reqs):
+    return {"prereqs": set(reqs["prereqs"]), "coreqs": set(reqs["coreqs"])}
+
+
+def extract_requisites_batch(descriptions, batch_size=None, n_process=None):
     """
-    Find the (Course_Num, Course_Name) and (Prerequisites, Corequisites)
-    Returned as list_of_titles and list_of_reqs respectively
+    Extracts requisites for many descriptions at once, sending every
+    not-yet-seen requisite block through a single nlp.pipe call.
+    Returns one {"prereqs", "coreqs"} dict per description, in order.
+    """
+    pending = {}
+    for text in descriptions:
+        if text in _requisite_memo or text in pending:
+            continue
+        block = requisite_block(text)
+        if block is None:
+            _requisite_memo[text] = {"prereqs": set(), "coreqs": set()}
+        else:
+            pending[text] = block
+
+    nlp = get_nlp()
+    if pending and nlp is None:
+        for text, (block_text, mode) in pending.items():
+            _requisite_memo[text] = classify_sentences(split_sentences(block_text), mode)
+    elif pending:
+        texts = list(pending)
+        docs = nlp.pipe(
+            (pending[text][0] for text in texts),
+            batch_size=batch_size or NLP_BATCH_SIZE,
+            n_process=n_process or NLP_PROCESSES,
+        )
+        for text, doc in zip(texts, docs):
+            sentences = [sent.text for sent in doc.sents]
+            _requisite_memo[text] = classify_sentences(sentences, pending[text][1])
+
+    return [_copy_reqs(_requisite_memo[text]) for text in descriptions]
+
+
+def extract_requisites(description_text):
+    """
+    Uses spaCy (or the regex fallback) to parse the entire requisite block
+    and uses a state machine to categorize courses.
+    """
+    return extract_requisites_batch([description_text])[0]
+
+
+def find_course_blocks(html_content):
+    """
+    Find the (Course_Num, Course_Name), raw description and content hash of
+    every undergraduate course block, without running any NLP.
+    Returned as list_of_titles, list_of_desc and list_of_hashes respectively
     """
     soup = BeautifulSoup(html_content, 'html.parser')
     titles_of_courses = soup.find_all(class_="courseblocktitle")
 
     # Find the Course Numbers and Names of all Classes in the chosen department
     list_of_titles = []
+    raw_titles = []
 
     for i in titles_of_courses:
         # Split only on the first period
@@ -158,128 +249,249 @@ def find_data(html_content):
             course_name = re.sub(r'\s+\(.*\)\s*\d*$', '', delimited_list[1]).strip()
             
             list_of_titles.append([course_id, course_name])
+            raw_titles.append(i.text)
 
         except (IndexError, ValueError):
             # Skip invalid formats
             continue
 
-    # Find the Pre-Requisites and Co-requisites of a Class
-    list_of_reqs = []
-    list_of_desc = []
-    
     # Get descriptions, but only for the courses we've already processed
     desc_of_courses = soup.find_all(class_="courseblockdesc")[:len(list_of_titles)]
-    
-    for desc_html in desc_of_courses:
-        desc_text = desc_html.text
-        list_of_desc.append(desc_text)
-        
-        # Call the spaCy function to extract requisites
-        reqs = extract_requisites(desc_text)
-        list_of_reqs.append(reqs)
+    list_of_desc = [desc_html.text for desc_html in desc_of_courses]
+
+    # Hash the raw title + description text so re-scrapes can spot unchanged courses
+    list_of_hashes = [
+        hashlib.sha256(f"{title}\n{desc}".encode("utf-8")).hexdigest()
+        for title, desc in zip(raw_titles, list_of_desc)
+    ]
+
+    return list_of_titles, list_of_desc, list_of_hashes
+
+
+def find_data(html_content):
+    """
+    Find the (Course_Num, Course_Name) and (Prerequisites, Corequisites)
+    Returned as list_of_titles and list_of_reqs respectively
+    """
+    list_of_titles, list_of_desc, _ = find_course_blocks(html_content)
+
+    # Run every description on the page through spaCy in one batch
+    list_of_reqs = extract_requisites_batch(list_of_desc)
     
     return list_of_titles, list_of_reqs, list_of_desc
 
 
-def find_prereqs(prerequisites, main_course_department, safe_table_name, cur):
-    """
-    Recursively finds and inserts prerequisite courses from other departments.
+# Per-run memo: department -> {course_id: (title, reqs, desc)}, so each
+# department page is parsed (BeautifulSoup + spaCy) at most once per run
+_parsed_departments = {}
+
+
+def index_courses(list_of_titles, list_of_reqs, list_of_desc):
+    """Key find_data() output by clean course id; the first block for an id wins."""
+    courses = {}
+    for title, reqs, desc in zip(list_of_titles, list_of_reqs, list_of_desc):
+        courses.setdefault(title[0].replace('\u00A0', ' ').strip(), (title, reqs, desc))
+    return courses
+
+
+def get_parsed_department(department):
+    """Fetch and parse a department page once per run; None if it could not be fetched."""
+    if department not in _parsed_departments:
+        html = get_html_content(department)
+        _parsed_departments[department] = index_courses(*find_data(html)) if html else None
+    return _parsed_departments[department]
+
+
+def find_prereqs(prerequisites, main_course_department, safe_table_name, writer, visited=None):
     """
-    sql_insert = f"""
-        INSERT OR REPLACE INTO {safe_table_name} 
-        (Course_Num, Course_Name, Pre_Requisites, Co_Requisites, Description)
-        VALUES (?, ?, ?, ?, ?)
+    Finds and inserts prerequisite courses from other departments, then their
+    prerequisites, and so on. Walks an explicit worklist one level at a time
+    (fetching each level's new departments in parallel) and never processes
+    a course twice, so deep or cyclic chains cost one visit per course.
+    Rows are queued on the CatalogWriter, not written here.
     """
-    
     if not prerequisites:
         return  # Base case: no prerequisites
 
-    # Loop through each prerequisite course ID in the set
-    for prereq_course_id in prerequisites:
-        # Check if this prerequisite is in a different department
-        if main_course_department not in str(prereq_course_id):
+    if visited is None:
+        visited = set()
+
+    # (course id, department of the course that needs it)
+    worklist = [(prereq_course_id, main_course_department) for prereq_course_id in prerequisites]
+
+    while worklist:
+        # Only courses from a different department than the one requiring them
+        worklist = [
+            (prereq_course_id, prereq_dept) for prereq_course_id, prereq_dept in worklist
+            if prereq_dept not in str(prereq_course_id) and prereq_course_id not in visited
+        ]
+        prefetch_departments(sorted({
+            prereq_course_id.split(" ")[0] for prereq_course_id, _ in worklist
+            if prereq_course_id.split(" ")[0] not in _parsed_departments
+        }))
+
+        next_worklist = []
+        for prereq_course_id, _ in worklist:
+            if prereq_course_id in visited:
+                continue
+            visited.add(prereq_course_id)
             try:
                 prereq_dept = prereq_course_id.split(" ")[0]  # e.g., "MATH"
 
-                # Check if we have already inserted this course
-                cur.execute(f"SELECT 1 FROM {safe_table_name} WHERE Course_Num = ?", (prereq_course_id,))
-                if cur.fetchone():
+                # Check if we already have this course
+                if writer.has(safe_table_name, prereq_course_id):
                     continue 
                 
-                # We don't have it. Scrape the new department.
+                # We don't have it. Look it up on its department's page.
                 print(f"--- Finding prereq: {prereq_course_id} from {prereq_dept} department...")
-                html = get_html_content(prereq_dept)
-                if not html:
+                courses = get_parsed_department(prereq_dept)
+                if courses is None:
                     print(f"Warning: Could not fetch {prereq_dept}. Skipping {prereq_course_id}.")
                     continue
 
-                # Parse the entire department page
-                new_titles, new_preqs, new_descs = find_data(html)
-                
-                # Find the specific course we're looking for
-                found_course = False
-                for k in range(len(new_titles)):
-                    clean_title_from_scrape = new_titles[k][0].replace('\u00A0', ' ').strip()
-                    
-                    # If we find the matching course (e.g., "MATH 1426")
-                    if prereq_course_id == clean_title_from_scrape:
-                        found_course = True
-                        
-                        # Get its data and prereqs
-                        prereqs_for_this_prereq_set = new_preqs[k]["prereqs"]
-                        coreqs_for_this_prereq_set = new_preqs[k]["coreqs"]
-                        
-                        # --- UPDATED: Use OR logic formatter ---
-                        prereqs_str = format_prerequisites_with_or_logic(
-                            prereqs_for_this_prereq_set, 
-                            new_descs[k]
-                        )
-                        coreqs_str = ', '.join(coreqs_for_this_prereq_set)
-                        
-                        data_tuple_for_prereq = (
-                            new_titles[k][0],      # Course_Num
-                            new_titles[k][1],      # Course_Name
-                            prereqs_str,           # Pre_Requisites with OR logic
-                            coreqs_str,            # Co_Requisites 
-                            str(new_descs[k]).strip()  # Description
-                        )
-                        
-                        # Insert this prerequisite course
-                        try:
-                            cur.execute(sql_insert, data_tuple_for_prereq)
-                        except Exception as e:
-                            print(f"Error inserting prereq {data_tuple_for_prereq[0]}: {e}")
-
-                        # Recursively find its prerequisites
-                        all_prereqs_for_prereq = prereqs_for_this_prereq_set.union(coreqs_for_this_prereq_set)
-                        if all_prereqs_for_prereq:
-                            find_prereqs(all_prereqs_for_prereq, prereq_dept, safe_table_name, cur)
-                        
-                        break 
-                
-                if not found_course:
+                found = courses.get(prereq_course_id)
+                if not found:
                     print(f"Warning: Could not find {prereq_course_id} on {prereq_dept} page.")
-                    
+                    continue
+
+                title, reqs, desc = found
+                prereqs_for_this_prereq_set = reqs["prereqs"]
+                coreqs_for_this_prereq_set = reqs["coreqs"]
+
+                # --- UPDATED: Use OR logic formatter ---
+                prereqs_str = format_prerequisites_with_or_logic(prereqs_for_this_prereq_set, desc)
+                coreqs_str = ', '.join(coreqs_for_this_prereq_set)
+
+                data_tuple_for_prereq = (
+                    title[0],              # Course_Num
+                    title[1],              # Course_Name
+                    prereqs_str,           # Pre_Requisites with OR logic
+                    coreqs_str,            # Co_Requisites 
+                    str(desc).strip(),     # Description
+                    None,                  # Content_Hash (only tracked for the department's own courses)
+                )
+
+                # Queue this prerequisite course
+                writer.add(safe_table_name, data_tuple_for_prereq)
+
+                # Queue its prerequisites for the next level
+                for next_id in prereqs_for_this_prereq_set.union(coreqs_for_this_prereq_set):
+                    next_worklist.append((next_id, prereq_dept))
+
             except Exception as e:
                 print(f"Recursive scrape error on {prereq_course_id}: {e}")
                 continue
 
+        worklist = next_worklist
+
     return
 
 
-def insert_courses(html_content, department):
+# Default output: data/classes.db at the repo root, the file the API reads
+CLASSES_DB_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '../../../data/classes.db'
+))
+
+
+def _clean_course_num(course_num):
+    return ' '.join(str(course_num).replace('\u00A0', ' ').split())
+
+
+class CatalogWriter:
+    """
+    Writer stage for the scraper. Parsed rows are buffered per table and
+    flushed with executemany in a single transaction, so the API (reading
+    classes.db in WAL mode) sees either the whole old catalog or the whole
+    new one, never a half-written department.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.getenv('SCRAPER_DB_PATH', CLASSES_DB_PATH)
+        self.db = sqlite3.connect(self.db_path)
+        # Readers keep working off the last committed snapshot during a refresh
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self._rows = {}      # table -> [row, ...] in insertion order
+        self._deletes = {}   # table -> [Course_Num, ...]
+        self._known = {}     # table -> clean Course_Nums stored or queued
+
+    def open_table(self, table, incremental=True):
+        """
+        Create the table if needed and return its stored {Course_Num: Content_Hash}.
+        In incremental mode stored rows also count as present for has().
+        """
+        ensure_classes_table(self.db.cursor(), table)
+        stored = dict(self.db.execute(f"SELECT Course_Num, Content_Hash FROM {table}").fetchall())
+        known = self._known.setdefault(table, set())
+        if incremental:
+            known.update(_clean_course_num(course_num) for course_num in stored)
+        return stored
+
+    def has(self, table, course_num):
+        return _clean_course_num(course_num) in self._known.get(table, ())
+
+    def add(self, table, row):
+        self._rows.setdefault(table, []).append(row)
+        self._known.setdefault(table, set()).add(_clean_course_num(row[0]))
+
+    def delete(self, table, course_nums):
+        self._deletes.setdefault(table, []).extend(course_nums)
+
+    def flush(self):
+        """Write everything queued in one transaction; nothing is written on error."""
+        with self.db:
+            for table, rows in self._rows.items():
+                self.db.executemany(f"""
+                    INSERT OR REPLACE INTO {table} 
+                    (Course_Num, Course_Name, Pre_Requisites, Co_Requisites, Description, Content_Hash)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, rows)
+            for table, course_nums in self._deletes.items():
+                self.db.executemany(
+                    f"DELETE FROM {table} WHERE Course_Num = ?",
+                    [(course_num,) for course_num in course_nums],
+                )
+        written = sum(len(rows) for rows in self._rows.values())
+        self._rows.clear()
+        self._deletes.clear()
+        return written
+
+    def close(self):
+        self.db.close()
+
+
+def ensure_classes_table(cur, safe_table_name):
+    """Create a department's classes table, or add Content_Hash to an older one."""
+    cur.execute(f"""CREATE TABLE IF NOT EXISTS {safe_table_name}(
+                                    Course_Num VARCHAR(10) NOT NULL PRIMARY KEY, 
+                                    Course_Name VARCHAR(100) NOT NULL, 
+                                    Pre_Requisites VARCHAR(200),
+                                    Co_Requisites VARCHAR(200),
+                                    Description VARCHAR(1000),
+                                    Content_Hash VARCHAR(64)
+                                    )""")
+    cur.execute(f"SELECT name FROM pragma_table_info('{safe_table_name}')")
+    if "Content_Hash" not in {row[0] for row in cur.fetchall()}:
+        cur.execute(f"ALTER TABLE {safe_table_name} ADD COLUMN Content_Hash VARCHAR(64)")
+
+
+def insert_courses(html_content, department, incremental=True, writer=None):
     """
     Insert courses into the database with OR logic preserved.
+
+    In incremental mode, courses whose block hash matches the stored
+    Content_Hash are skipped before any NLP or prerequisite lookups, and
+    courses of this department that vanished from the page are deleted.
+    Rows go through a CatalogWriter; pass one in to commit several
+    departments together, otherwise this department is committed on its own.
+    Returns {"added": [...], "changed": [...], "removed": [...], "unchanged": n}.
     """
-    db_path = "SmartAdvisors/data/classes.db"
+    own_writer = writer is None
+    if own_writer:
+        writer = CatalogWriter()
     
-    db = sqlite3.connect(db_path)
-    cur = db.cursor()
-    
-    list_of_titles, list_of_preqs, description = find_data(html_content)
+    list_of_titles, description, hashes = find_course_blocks(html_content)
     
     print(f"Found {len(list_of_titles)} titles.")
-    print(f"Found {len(list_of_preqs)} requisite lists.")
     print(f"Found {len(description)} descriptions.")
 
     # Sanitize department name for table name
@@ -287,79 +499,133 @@ def insert_courses(html_content, department):
 
     # Create the Classes Table if not already present
     try:
-        cur.execute(f"""CREATE TABLE IF NOT EXISTS {safe_table_name}(
-                                        Course_Num VARCHAR(10) NOT NULL PRIMARY KEY, 
-                                        Course_Name VARCHAR(100) NOT NULL, 
-                                        Pre_Requisites VARCHAR(200),
-                                        Co_Requisites VARCHAR(200),
-                                        Description VARCHAR(1000)
-                                        )""")
+        stored = writer.open_table(safe_table_name, incremental)
     except Exception as e:
         print(f"Error creating table: {e}")
-        db.close()
+        if own_writer:
+            writer.close()
         return
 
-    sql_insert = f"""
-        INSERT OR REPLACE INTO {safe_table_name} 
-        (Course_Num, Course_Name, Pre_Requisites, Co_Requisites, Description)
-        VALUES (?, ?, ?, ?, ?)
-    """
-    
-    i = 0
-    while i < len(list_of_titles):
-        prereqs_set = list_of_preqs[i]["prereqs"]
-        coreqs_set = list_of_preqs[i]["coreqs"]
+    # Only courses that are new or whose block changed need parsing; a full
+    # refresh parses everything but still reports against the stored hashes
+    modified = [i for i in range(len(description)) if stored.get(list_of_titles[i][0]) != hashes[i]]
+    to_parse = modified if incremental else list(range(len(description)))
+    report = {
+        "added": [list_of_titles[i][0] for i in modified if list_of_titles[i][0] not in stored],
+        "changed": [list_of_titles[i][0] for i in modified if list_of_titles[i][0] in stored],
+        "removed": [],
+        "unchanged": len(description) - len(modified),
+    }
+
+    list_of_preqs = extract_requisites_batch([description[i] for i in to_parse])
+    if len(to_parse) == len(list_of_titles):
+        _parsed_departments[department] = index_courses(list_of_titles, list_of_preqs, description)
+
+    # Fetch every other department these courses depend on in parallel up front
+    prereq_departments = {
+        code.split(" ")[0]
+        for reqs in list_of_preqs
+        for code in reqs["prereqs"] | reqs["coreqs"]
+        if department not in code
+    }
+    prefetch_departments(sorted(prereq_departments))
+
+    # Prerequisite courses already handled this run
+    visited = set()
+
+    for i, reqs in zip(to_parse, list_of_preqs):
+        prereqs_set = reqs["prereqs"]
+        coreqs_set = reqs["coreqs"]
         
         # --- UPDATED: Use OR logic formatter ---
         prereqs_str = format_prerequisites_with_or_logic(prereqs_set, description[i])
         coreqs_str = ', '.join([str(item) for item in coreqs_set])
         
-        # First, find and insert all prerequisites for this course
+        # First, find and queue all prerequisites for this course
         all_reqs_set = prereqs_set.union(coreqs_set)
-        find_prereqs(all_reqs_set, department, safe_table_name, cur)
+        find_prereqs(all_reqs_set, department, safe_table_name, writer, visited)
         
-        # Now insert the main course
-        data = (
+        # Now queue the main course (after its prerequisites, so it wins)
+        writer.add(safe_table_name, (
             list_of_titles[i][0],         # Course_Num
             list_of_titles[i][1],         # Course_Name
             str(prereqs_str),             # Pre_Requisites with OR logic
             str(coreqs_str),              # Co_Requisites 
-            str(description[i]).strip()   # Description
-        )
+            str(description[i]).strip(),  # Description
+            hashes[i],                    # Content_Hash
+        ))
+
+    # Courses of this department that are no longer in the catalog.
+    # Prerequisite rows from other departments are left alone.
+    if incremental and list_of_titles:
+        on_page = {title[0] for title in list_of_titles}
+        report["removed"] = [
+            course_num for course_num in stored
+            if course_num not in on_page
+            and _clean_course_num(course_num).split(" ")[0] == department
+        ]
+        writer.delete(safe_table_name, report["removed"])
+
+    if own_writer:
         try:
-            cur.execute(sql_insert, data)
-            i += 1
+            writer.flush()
         except Exception as e:
-            print(f"Error inserting {data[0]}: {e}")
-            i += 1
+            print(f"Error saving {department}, no changes written: {e}")
+            return
+        finally:
+            writer.close()
+        print(f"Successfully processed and saved data for {department} to {writer.db_path}")
+
+    print(f"Added {len(report['added'])}, changed {len(report['changed'])}, "
+          f"removed {len(report['removed'])}, unchanged {report['unchanged']}.")
+    return report
 
-    db.commit()
-    db.close()
-    print(f"Successfully processed and saved data for {department} to {db_path}")
+
+CATALOG_URL = "https://catalog.uta.edu/coursedescriptions/{department}"
+
+# One pooled session + on-disk page cache shared by the whole scrape run
+_page_fetcher = None
+
+def get_page_fetcher():
+    """
+    The run's PageFetcher. SCRAPER_MAX_WORKERS bounds concurrent requests,
+    SCRAPER_CACHE_DIR moves the page cache and SCRAPER_OFFLINE=1 re-scrapes
+    purely from cached pages.
+    """
+    global _page_fetcher
+    if _page_fetcher is None:
+        _page_fetcher = PageFetcher(
+            cache=PageCache(os.getenv('SCRAPER_CACHE_DIR', DEFAULT_CACHE_DIR)),
+            max_workers=int(os.getenv('SCRAPER_MAX_WORKERS', '4')),
+            offline=os.getenv('SCRAPER_OFFLINE') == '1',
+        )
+    return _page_fetcher
 
 
 def get_html_content(department):
     """
     Fetch HTML content from UTA course catalog.
     """
-    department = department.lower()
-    website = f"https://catalog.uta.edu/coursedescriptions/{department}"
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-
-    print(f"Requesting data from {website}...")
-    try:
-        response = requests.get(website, headers=headers)
-        response.raise_for_status()
+    html = get_page_fetcher().fetch(CATALOG_URL.format(department=department.lower()))
+    if html:
         print("Success.")
-        return response.text
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching URL: {e}")
-        return None
+    return html
+
+
+def prefetch_departments(departments):
+    """
+    Fetch several department pages concurrently so later get_html_content()
+    calls for them are served from memory.
+    """
+    urls = [CATALOG_URL.format(department=d.lower()) for d in departments]
+    get_page_fetcher().fetch_many(urls)
 
 
 # --- Main execution ---
 if __name__ == "__main__":
     department = "CE"  # Change this to scrape other departments
+    # SCRAPER_FULL_REFRESH=1 re-parses and rewrites every course
+    incremental = os.getenv('SCRAPER_FULL_REFRESH') != '1'
     
     print(f"Starting scraper for {department} department...")
     print("OR logic will be preserved (format: COURSE1|COURSE2 for OR relationships)")
@@ -367,7 +633,7 @@ if __name__ == "__main__":
     
     html = get_html_content(department)
     if html:
-        insert_courses(html, department)
+        insert_courses(html, department, incremental=incremental)
         print("\n✓ Scraping complete!")
         print("Prerequisites with OR logic are stored using the '|' separator")
         print("Example: 'MATH 3133|IE 3301' means MATH 3133 OR IE 3301")
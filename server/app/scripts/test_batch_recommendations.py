@@ -0,0 +1,85 @@
+import json
+import random
+
+import pytest
+
+from benchmarks import synthetic
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp('data')
+    synthetic.generate(str(data_dir), scale=0.5, seed=7)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('DATA_DIR', str(data_dir))
+        mp.setenv('SQLALCHEMY_DATABASE_URI', 'sqlite:///' + str(data_dir / 'professors.db'))
+        from app import create_app
+        yield create_app().test_client()
+
+
+def test_batch_matches_single_student_requests(client):
+    prefs_a = {'easyGrader': True, 'caring': True}
+    prefs_b = {'groupProjects': True, 'popQuizzes': True, 'lectureHeavy': False}
+    students = [
+        {'id': 's1', 'department': 'CSE', 'completed_courses': [], 'preferences': prefs_a},
+        {'id': 's2', 'department': 'CE', 'completed_courses': ['CE 1000', 'CE 1001'], 'preferences': prefs_b},
+        # Same department and preferences as s1: shares its ranked courses
+        {'id': 's3', 'department': 'CSE', 'completed_courses': ['CSE 1000'], 'preferences': prefs_a},
+        {'id': 's4', 'department': 'CSE', 'completed_courses': ['CSE 1000'], 'preferences': prefs_b},
+        {'id': 's5', 'preferences': prefs_a},
+    ]
+    response = client.post('/api/recommendations/batch', json={'students': students})
+    assert response.status_code == 200
+    header, *records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert header == {'success': True, 'studentCount': len(students)}
+
+    by_index = {record['index']: record for record in records}
+    assert by_index[4] == {'index': 4, 'id': 's5', 'error': 'Department required'}
+    for index, student in enumerate(students[:4]):
+        single = client.post('/api/recommendations', data={
+            'department': student['department'],
+            'completed_courses': json.dumps(student['completed_courses']),
+            'preferences': json.dumps(student['preferences']),
+        }).get_json()
+        assert single['recommendations']
+        assert by_index[index] == {
+            'index': index, 'id': student['id'], 'success': True,
+            'department': student['department'], 'recommendations': single['recommendations'],
+        }
+
+
+def test_batch_matches_singles_for_a_diverse_cohort(client):
+    from benchmarks.batch import PREFERENCE_FLAGS
+
+    rng = random.Random(3)
+    codes = [f"CSE {1000 + i}" for i in range(20)]
+    students = [
+        {
+            'id': f"s{i}", 'department': 'CSE',
+            'completed_courses': rng.sample(codes, rng.randint(0, 10)),
+            'preferences': {flag: rng.random() < 0.5 for flag in PREFERENCE_FLAGS},
+        }
+        for i in range(30)
+    ]
+    response = client.post('/api/recommendations/batch', json={'students': students})
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()[1:]]
+    assert [record['index'] for record in records] == list(range(len(students)))
+    for student, record in zip(students, records):
+        single = client.post('/api/recommendations', data={
+            'department': 'CSE',
+            'completed_courses': json.dumps(student['completed_courses']),
+            'preferences': json.dumps(student['preferences']),
+        }).get_json()
+        assert record['recommendations'] == single['recommendations']
+
+
+@pytest.mark.parametrize('completed', ['5', '"CSE 1000"', '{"CSE 1000": true}', '[1000]'])
+def test_completed_courses_must_be_course_codes(client, completed):
+    response = client.post('/api/recommendations', data={'department': 'CSE', 'completed_courses': completed})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'completed_courses must be a list of course codes'}
+
+    student = {'department': 'CSE', 'completed_courses': json.loads(completed)}
+    response = client.post('/api/recommendations/batch', json={'students': [student]})
+    record = json.loads(response.get_data(as_text=True).splitlines()[1])
+    assert record == {'index': 0, 'id': None, 'error': 'completed_courses must be a list of course codes'}
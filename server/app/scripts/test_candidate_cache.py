@@ -0,0 +1,86 @@
+import threading
+
+from app import recommender
+from app.recommender import CandidateCache
+
+
+def fake_builder(monkeypatch):
+    calls = []
+
+    def build_course_candidates(course_codes):
+        calls.append(list(course_codes))
+        return {code: (f'{code} candidate',) for code in course_codes}
+
+    monkeypatch.setattr(recommender, 'build_course_candidates', build_course_candidates)
+    return calls
+
+
+def test_missing_courses_are_built_once_in_a_batch(monkeypatch):
+    calls = fake_builder(monkeypatch)
+    cache = CandidateCache()
+
+    first = cache.get('CSE', ['CSE 1310', 'CSE 1320'], version=('v1',))
+    assert first == {'CSE 1310': ('CSE 1310 candidate',), 'CSE 1320': ('CSE 1320 candidate',)}
+    assert cache.get('CSE', ['CSE 1320'], version=('v1',)) is first
+    assert cache.get('CSE', ['CSE 1310', 'CSE 2312'], version=('v1',)) is first
+    assert 'CSE 2312' in first
+    assert calls == [['CSE 1310', 'CSE 1320'], ['CSE 2312']]
+    assert cache.builds == 2
+
+
+def test_version_change_drops_the_department(monkeypatch):
+    calls = fake_builder(monkeypatch)
+    cache = CandidateCache()
+
+    old = cache.get('CSE', ['CSE 1310', 'CSE 1320'], version=('v1',))
+    new = cache.get('CSE', ['CSE 1310'], version=('v2',))
+    assert new is not old
+    assert list(new) == ['CSE 1310']
+    assert calls[-1] == ['CSE 1310']
+    assert cache.builds == 2
+    # The old version's dict is left untouched for readers still holding it
+    assert list(old) == ['CSE 1310', 'CSE 1320']
+
+
+def test_departments_and_clear_are_independent(monkeypatch):
+    calls = fake_builder(monkeypatch)
+    cache = CandidateCache()
+
+    cache.get('CSE', ['CSE 1310'], version=('v1',))
+    cache.get('MAE', ['MAE 2312'], version=('v1',))
+    cache.get('CSE', ['CSE 1310'], version=('v1',))
+    assert cache.builds == 2
+
+    cache.clear()
+    cache.get('CSE', ['CSE 1310'], version=('v1',))
+    assert cache.builds == 3
+    assert calls == [['CSE 1310'], ['MAE 2312'], ['CSE 1310']]
+
+
+def test_a_cold_department_does_not_block_the_others(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def build_course_candidates(course_codes):
+        calls.append(list(course_codes))
+        if course_codes[0].startswith('CSE'):
+            started.set()
+            assert release.wait(5)
+        return {code: (f'{code} candidate',) for code in course_codes}
+
+    monkeypatch.setattr(recommender, 'build_course_candidates', build_course_candidates)
+    cache = CandidateCache()
+
+    slow = [threading.Thread(target=cache.get, args=('CSE', ['CSE 1310'], ('v1',))) for _ in range(2)]
+    for thread in slow:
+        thread.start()
+    assert started.wait(5)
+    # MAE builds while CSE's build is still running
+    assert cache.get('MAE', ['MAE 2312'], version=('v1',)) == {'MAE 2312': ('MAE 2312 candidate',)}
+    release.set()
+    for thread in slow:
+        thread.join(5)
+
+    # The second CSE request waited for the first build instead of repeating it
+    assert calls == [['CSE 1310'], ['MAE 2312']]
+    assert cache.builds == 2
@@ -0,0 +1,94 @@
+import re
+
+import pytest
+
+from app.recommender import candidate_cache
+from app.response_cache import recommendation_cache
+from benchmarks import synthetic
+
+FORM = {'department': 'CSE', 'completed_courses': '["CSE 1000"]', 'preferences': '{"caring": true}'}
+ENDPOINT = 'api.get_recommendations'
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp('data')
+    synthetic.generate(str(data_dir), scale=0.5, seed=13)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('DATA_DIR', str(data_dir))
+        mp.setenv('SQLALCHEMY_DATABASE_URI', 'sqlite:///' + str(data_dir / 'professors.db'))
+        from app import create_app
+        yield create_app().test_client()
+
+
+def scrape(client):
+    """{sample name with labels: value} and {metric: type} from /metrics."""
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    samples, types = {}, {}
+    for line in response.get_data(as_text=True).splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split()
+            types[name] = kind
+        elif line and not line.startswith('#'):
+            sample, value = line.rsplit(' ', 1)
+            samples[sample] = float(value)
+    return samples, types
+
+
+def test_server_timing_lists_the_stages_of_the_request(client):
+    recommendation_cache.clear()
+    response = client.post('/api/recommendations', data=FORM)
+    assert response.status_code == 200
+    timings = dict(re.findall(r'(\w+);dur=([\d.]+)', response.headers['Server-Timing']))
+    assert {'catalog', 'eligibility', 'scoring', 'serialize', 'total'} <= set(timings)
+    assert float(timings['total']) >= float(timings['scoring'])
+
+
+def test_stages_and_queries_land_in_the_histograms(client):
+    before, _ = scrape(client)
+    # Cold candidates, so the offerings are read from the grades database
+    recommendation_cache.clear()
+    candidate_cache.clear()
+    assert client.post('/api/recommendations', data=FORM).status_code == 200
+    after, _ = scrape(client)
+
+    def grew(sample):
+        return after[sample] - before.get(sample, 0)
+
+    for name in ('catalog', 'eligibility', 'offerings', 'professor_match', 'scoring', 'serialize'):
+        assert grew(f'smartadvisors_stage_duration_seconds_count{{stage="{name}"}}') >= 1
+    assert grew(f'smartadvisors_request_duration_seconds_count{{endpoint="{ENDPOINT}"}}') == 1
+    assert grew(f'smartadvisors_db_queries_per_request_count{{endpoint="{ENDPOINT}"}}') == 1
+    # sqlite3 queries (catalog, grades) count as well as SQLAlchemy ones
+    assert grew(f'smartadvisors_db_queries_per_request_sum{{endpoint="{ENDPOINT}"}}') >= 1
+    # Buckets are cumulative up to +Inf, which equals the count
+    assert after[f'smartadvisors_request_duration_seconds_bucket{{endpoint="{ENDPOINT}",le="+Inf"}}'] == (
+        after[f'smartadvisors_request_duration_seconds_count{{endpoint="{ENDPOINT}"}}']
+    )
+    assert grew('smartadvisors_cache_misses_total{cache="response"}') == 1
+
+
+def test_metrics_exposition_names(client):
+    client.post('/api/recommendations', data=FORM)
+    samples, types = scrape(client)
+    assert types == {
+        'smartadvisors_request_duration_seconds': 'histogram',
+        'smartadvisors_stage_duration_seconds': 'histogram',
+        'smartadvisors_db_queries_per_request': 'histogram',
+        'smartadvisors_cache_hits_total': 'counter',
+        'smartadvisors_cache_misses_total': 'counter',
+        'smartadvisors_cache_evictions_total': 'counter',
+        'smartadvisors_candidate_builds_total': 'counter',
+        'smartadvisors_professor_index_rebuilds_total': 'counter',
+        'smartadvisors_professor_matches_total': 'counter',
+        'smartadvisors_transcript_job_files_total': 'counter',
+        'smartadvisors_transcript_parses_total': 'counter',
+        'smartadvisors_cache_entries': 'gauge',
+    }
+    assert 'smartadvisors_cache_hits_total{cache="response"}' in samples
+    assert 'smartadvisors_cache_entries{cache="transcript"}' in samples
+    # /metrics itself is neither timed nor given a Server-Timing header
+    assert 'Server-Timing' not in client.get('/metrics').headers
+    assert not any('endpoint="metrics"' in sample for sample in samples)
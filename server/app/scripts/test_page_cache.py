@@ -0,0 +1,85 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.scripts.page_cache import PageCache, PageFetcher
+
+
+PAGES = {
+    '/coursedescriptions/math': '<html>MATH 1426</html>',
+    '/coursedescriptions/phys': '<html>PHYS 1443</html>',
+}
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the catalog site that honours If-None-Match."""
+    requests_seen = []
+
+    def do_GET(self):
+        body = PAGES.get(self.path)
+        self.requests_seen.append((self.path, self.headers.get('If-None-Match')))
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        etag = '"' + hashlib.sha256(body.encode()).hexdigest()[:16] + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def catalog_server():
+    CatalogHandler.requests_seen = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CatalogHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_many_downloads_each_page_once(tmp_path, catalog_server):
+    _, base = catalog_server
+    fetcher = PageFetcher(PageCache(str(tmp_path)), max_workers=2)
+    urls = [f'{base}/coursedescriptions/math', f'{base}/coursedescriptions/phys']
+
+    pages = fetcher.fetch_many(urls + urls)
+    assert pages == {urls[0]: PAGES['/coursedescriptions/math'], urls[1]: PAGES['/coursedescriptions/phys']}
+    assert fetcher.fetch(urls[0]) == PAGES['/coursedescriptions/math']
+    assert len(CatalogHandler.requests_seen) == 2
+
+
+def test_cached_page_is_revalidated_with_etag(tmp_path, catalog_server):
+    _, base = catalog_server
+    url = f'{base}/coursedescriptions/math'
+    PageFetcher(PageCache(str(tmp_path))).fetch(url)
+
+    fetcher = PageFetcher(PageCache(str(tmp_path)))
+    assert fetcher.fetch(url) == PAGES['/coursedescriptions/math']
+    assert fetcher.stats['revalidated'] == 1
+    assert CatalogHandler.requests_seen[-1][1] is not None
+
+
+def test_offline_rescrape_uses_cached_pages(tmp_path, catalog_server):
+    server, base = catalog_server
+    url = f'{base}/coursedescriptions/phys'
+    PageFetcher(PageCache(str(tmp_path))).fetch(url)
+    server.shutdown()
+    server.server_close()
+
+    assert PageFetcher(PageCache(str(tmp_path)), offline=True).fetch(url) == PAGES['/coursedescriptions/phys']
+    # Network down but a cached copy exists: fall back to it
+    assert PageFetcher(PageCache(str(tmp_path)), timeout=2).fetch(url) == PAGES['/coursedescriptions/phys']
+    assert PageFetcher(PageCache(str(tmp_path)), offline=True).fetch(f'{base}/coursedescriptions/cse') is None
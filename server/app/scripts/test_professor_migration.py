@@ -0,0 +1,66 @@
+import importlib.util
+import os
+from types import SimpleNamespace
+
+import pytest
+import sqlalchemy as sa
+
+from app.professor_index import ProfessorRecord
+
+MIGRATION = os.path.join(
+    os.path.dirname(__file__), '../../migrations/versions/3f2a9c1d7b4e_typed_professor_columns.py'
+)
+
+
+@pytest.fixture(scope='module')
+def migration():
+    spec = importlib.util.spec_from_file_location('typed_professor_columns', MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize('value, cast, expected', [
+    ('3.8', float, 3.8),
+    (' 49 ', int, 49),
+    ('12.0', int, 12),
+    ('84%', float, 84.0),
+    ('N/A', float, None),
+    ('Add', int, None),
+    ('', int, None),
+    (None, float, None),
+])
+def test_to_number(migration, value, cast, expected):
+    assert migration._to_number(value, cast) == expected
+
+
+def test_split_tags_trims_and_drops_duplicates(migration):
+    assert migration._split_tags('Caring , Tough grader,caring,, EXTRA CREDIT') == [
+        'Caring', 'Tough grader', 'EXTRA CREDIT'
+    ]
+    assert migration._split_tags(None) == []
+    assert migration._split_tags('') == []
+
+
+def test_professor_record_converts_unmigrated_text():
+    row = SimpleNamespace(
+        id='1', name='Ana Lee', rmp_name='Ana Lee', department='Engineering', rating='4.1',
+        difficulty='2.0', total_ratings='Add', would_take_again='84%', tags='Caring',
+    )
+    record = ProfessorRecord(row)
+    assert record.total_ratings is None
+    assert record.would_take_again == 84.0
+
+    row.total_ratings, row.would_take_again = '14', 'N/A'
+    record = ProfessorRecord(row)
+    assert record.total_ratings == 14
+    assert record.would_take_again is None
+
+
+def test_tag_foreign_key_has_the_professor_id_type(migration):
+    from app.models import Professor, ProfessorTag
+
+    assert isinstance(Professor.__table__.c.id.type, sa.Text)
+    assert isinstance(ProfessorTag.__table__.c.professor_id.type, sa.Text)
+    assert isinstance(migration.professors.c.id.type, sa.Text)
+    assert isinstance(migration.ID_TYPE, sa.Text)
@@ -0,0 +1,228 @@
+import sqlite3
+
+import pytest
+
+from app.scripts import recommendation_engine as engine
+from app.scripts.recommendation_engine import PrerequisiteGraph, split_requisites
+
+
+def course(num, prereqs='', coreqs=''):
+    return {'Course_Num': num, 'Course_Name': num, 'Pre_Requisites': prereqs, 'Co_Requisites': coreqs}
+
+
+def test_split_requisites_reads_or_groups():
+    assert split_requisites('CSE 2320, MATH 3133|IE 3301') == [['CSE 2320'], ['MATH 3133', 'IE 3301']]
+    assert split_requisites('None') == []
+    assert split_requisites(None) == []
+
+
+def test_or_prerequisite_is_met_by_either_course():
+    graph = PrerequisiteGraph([course('MATH\xa01421', 'MATH 1315, MATH 1302|MATH 1402')])
+    assert 'MATH 1421' in graph.eligible(['MATH 1315', 'MATH 1402'])
+    assert 'MATH 1421' in graph.eligible(['MATH 1315', 'MATH 1302'])
+    assert 'MATH 1421' not in graph.eligible(['MATH 1302', 'MATH 1402'])
+
+
+def test_corequisite_can_be_taken_alongside():
+    graph = PrerequisiteGraph([
+        course('CE 1353', coreqs='MATH 1421'),
+        course('MATH 1421', 'MATH 1302'),
+    ])
+    assert list(graph.eligible([])) == []
+    assert list(graph.eligible(['MATH 1302'])) == ['CE 1353', 'MATH 1421']
+    assert list(graph.eligible(['MATH 1421'])) == ['CE 1353']
+
+
+def test_eligible_many_matches_eligible():
+    graph = PrerequisiteGraph([
+        course('CE 1353', coreqs='MATH 1421'),
+        course('MATH 1421', 'MATH 1302'),
+        course('MATH 1302'),
+        course('CE 2313', 'CE 1353, MATH 1421|MATH 1302'),
+        course('CE 1353', coreqs='MATH 1421'),
+        course('CE 3343', 'CE 2313', 'CE 3143'),
+        course('CE 3143', 'MATH 1421'),
+    ])
+    completed_lists = [
+        [], ['MATH 1302'], ['MATH 1421'], ['MATH 1302', 'CE 1353'], ['CE 2313', 'MATH 1421'],
+        ['MATH\xa01302', 'CE 1353', 'MATH 1421', 'CE 2313'], ['MATH 1302'], ['UNKNOWN 1000'],
+    ]
+    many = graph.eligible_many(completed_lists)
+    assert [list(eligible.items()) for eligible in many] == [
+        list(graph.eligible(completed).items()) for completed in completed_lists
+    ]
+    # Students with the same eligible courses share one result
+    assert many[1] is many[6]
+
+
+def write_grades(path):
+    conn = sqlite3.connect(path)
+    for term, rows in (
+        ('Fall 2023', [('CE', '1105', 'Alice Smith', 3.1), ('CE', '2311', 'Bob Jones', 2.8)]),
+        ('Spring 2024', [('CE', '1105', 'Carol White', 3.4), ('MATH', '1426', 'Dan Green', 2.5)]),
+    ):
+        conn.execute(f'''CREATE TABLE "{term}" (
+                            subject_id TEXT, course_number TEXT, course_title TEXT, year INTEGER,
+                            semester TEXT, instructor1 TEXT, instructor2 TEXT, instructor3 TEXT,
+                            instructor4 TEXT, instructor5 TEXT, course_gpa REAL)''')
+        conn.executemany(
+            f'INSERT INTO "{term}" VALUES (?, ?, ?, 2024, ?, ?, NULL, NULL, NULL, NULL, ?)',
+            [(subject, number, f"{subject} {number}", term.split()[0], name, gpa)
+             for subject, number, name, gpa in rows]
+        )
+    conn.commit()
+    conn.close()
+
+
+def test_offerings_match_with_and_without_consolidation(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATA_DIR', str(tmp_path))
+    write_grades(tmp_path / 'grades.sqlite')
+    codes = ['CE 1105', 'CE 2311', 'MATH 1426', 'CSE 1310']
+
+    # Reading never rewrites the data file; it falls back to the term tables
+    before = engine.get_offerings_for_courses(codes)
+    assert 'offerings' not in tables_in(tmp_path / 'grades.sqlite')
+    assert [o['instructors'] for o in before['CE 1105']] == [['Alice Smith'], ['Carol White']]
+    assert before['CSE 1310'] == []
+
+    engine.consolidate_grade_tables()
+    assert engine.get_offerings_for_courses(codes) == before
+
+
+def test_rows_added_to_a_term_table_make_the_offerings_stale(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATA_DIR', str(tmp_path))
+    db_path = str(tmp_path / 'grades.sqlite')
+    write_grades(db_path)
+    engine.consolidate_grade_tables()
+    monkeypatch.setattr(engine, '_offerings_checked', None)
+    assert engine._offerings_table_current(db_path)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """INSERT INTO "Fall 2023" VALUES ('CE', '1105', 'CE 1105', 2024, 'Fall', 'Eve Black',
+                                            NULL, NULL, NULL, NULL, 3.0)"""
+    )
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(engine, '_offerings_checked', None)
+    assert not engine._offerings_table_current(db_path)
+    offerings = engine.get_offerings_for_courses(['CE 1105'])['CE 1105']
+    assert [o['instructors'] for o in offerings] == [['Alice Smith'], ['Eve Black'], ['Carol White']]
+
+    engine.consolidate_grade_tables()
+    monkeypatch.setattr(engine, '_offerings_checked', None)
+    assert engine._offerings_table_current(db_path)
+
+
+def test_offerings_lookup_uses_the_course_index(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATA_DIR', str(tmp_path))
+    write_grades(tmp_path / 'grades.sqlite')
+    engine.consolidate_grade_tables()
+
+    statements = []
+    monkeypatch.setattr(engine, 'query_listener', statements.append)
+    engine.get_offerings_for_courses(['CE 1105', 'CE 2311', 'MATH 1426'])
+    lookups = [sql for sql in statements if 'FROM offerings WHERE' in sql]
+    assert len(lookups) == 2  # one per subject
+
+    conn = sqlite3.connect(tmp_path / 'grades.sqlite')
+    plan = conn.execute('EXPLAIN QUERY PLAN ' + lookups[0]).fetchall()
+    conn.close()
+    assert 'USING INDEX idx_offerings_course' in ' '.join(row[-1] for row in plan)
+
+
+def tables_in(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    finally:
+        conn.close()
+
+
+PROFESSORS = [
+    ('1', 'Ana Lee', 'Ana Lee'),
+    ('2', 'Bill Carroll', 'William Carroll'),
+    ('3', 'Zhen Garcia', 'Zhen Garcia'),
+]
+
+
+def write_professors(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE IF NOT EXISTS professors (
+                        id TEXT PRIMARY KEY, name TEXT, rmp_name TEXT, url TEXT, department TEXT,
+                        quality_rating TEXT, difficulty_rating TEXT, total_ratings TEXT,
+                        would_take_again TEXT, tags TEXT)""")
+    conn.executemany(
+        "INSERT INTO professors VALUES (?, ?, ?, '', 'Engineering', '4.0', '3.0', '10', '80%', '')", rows
+    )
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def professors_app(tmp_path, monkeypatch):
+    from app import create_app
+
+    db_path = tmp_path / 'professors.db'
+    write_professors(db_path, PROFESSORS)
+    monkeypatch.setenv('SQLALCHEMY_DATABASE_URI', f'sqlite:///{db_path}')
+    app = create_app()
+    with app.app_context():
+        yield app, db_path
+
+
+@pytest.mark.parametrize('instructor, expected_id, tier', [
+    ('Ana Lee', '1', 'exact'),
+    ('  ANA   lee ', '1', 'exact'),
+    ('William Carroll', '2', 'exact'),  # RateMyProfessor alias
+    ('Lee, Ana', '1', 'swapped'),
+    ('Garcia, Zhen', '3', 'swapped'),
+    ('Carroll, Billy', '2', 'last_name'),
+    ('J. Garcia', '3', 'last_name'),
+    ('Nobody Known', None, 'miss'),
+])
+def test_professor_index_tiers(professors_app, instructor, expected_id, tier):
+    from app.professor_index import ProfessorIndex
+
+    index = ProfessorIndex()
+    record = index.resolve_many([instructor])[instructor]
+    assert (record.id if record else None) == expected_id
+    assert index.counters[tier] == 1
+
+
+def test_professor_index_keys_match_names_stored_with_commas(professors_app):
+    from app.professor_index import ProfessorIndex
+
+    _, db_path = professors_app
+    write_professors(db_path, [('5', 'Nguyen,  Mai', 'Mai Nguyen')])
+    index = ProfessorIndex()
+    names = ['Nguyen, Mai', 'NGUYEN ,MAI', 'Mai Nguyen', 'Nguyen, M.']
+    assert {name: record.id for name, record in index.resolve_many(names).items()} == dict.fromkeys(names, '5')
+    assert index.counters == {'exact': 3, 'swapped': 0, 'last_name': 1, 'miss': 0}
+
+
+def test_professor_index_counts_lookups_from_many_threads(professors_app):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.professor_index import ProfessorIndex
+
+    index = ProfessorIndex()
+    index.refresh()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(index.lookup, ['Ana Lee', 'Lee, Ana', 'Nobody Known'] * 2000))
+    assert index.stats()['exact'] == 2000
+    assert index.counters == {'exact': 2000, 'swapped': 2000, 'last_name': 0, 'miss': 2000}
+
+
+def test_professor_index_rebuilds_when_data_changes(professors_app):
+    from app.professor_index import ProfessorIndex
+
+    _, db_path = professors_app
+    index = ProfessorIndex()
+    assert index.resolve_many(['Omar Patel'])['Omar Patel'] is None
+    index.refresh()
+    assert index.rebuilds == 1
+
+    write_professors(db_path, [('4', 'Omar Patel', 'Omar Patel')])
+    assert index.resolve_many(['Omar Patel'])['Omar Patel'].id == '4'
+    assert index.rebuilds == 2
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from app.response_cache import recommendation_cache
+from benchmarks import synthetic
+
+FORM = {
+    'department': 'CSE',
+    'completed_courses': '["CSE 1000", "CSE 1001"]',
+    'preferences': '{"easyGrader": true, "groupProjects": true}',
+}
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp('data')
+    synthetic.generate(str(data_dir), scale=0.5, seed=5)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('DATA_DIR', str(data_dir))
+        mp.setenv('SQLALCHEMY_DATABASE_URI', 'sqlite:///' + str(data_dir / 'professors.db'))
+        from app import create_app
+        yield create_app().test_client()
+
+
+def read_stream(response):
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    header, *courses = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert header == {'success': True, 'department': 'CSE', 'courseCount': len(courses)}
+    return courses
+
+
+def test_streamed_courses_equal_the_json_response(client):
+    recommendation_cache.clear()
+    body = client.post('/api/recommendations', data=FORM).get_json()
+    assert body['recommendations']
+
+    courses = read_stream(client.post('/api/recommendations?stream=1', data=FORM))
+    assert courses == body['recommendations']
+
+
+def test_accept_header_selects_streaming(client):
+    expected = client.post('/api/recommendations', data=FORM).get_json()['recommendations']
+
+    streamed = client.post('/api/recommendations', data=FORM, headers={'Accept': 'application/x-ndjson'})
+    assert read_stream(streamed) == expected
+
+    # JSON stays the default, and wins when both are acceptable
+    for accept in ('*/*', 'application/json, application/x-ndjson'):
+        response = client.post('/api/recommendations', data=FORM, headers={'Accept': accept})
+        assert response.mimetype == 'application/json'
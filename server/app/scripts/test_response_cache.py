@@ -0,0 +1,112 @@
+import pytest
+
+from app import response_cache
+from app.response_cache import ResponseCache, recommendation_cache_key
+from benchmarks import synthetic
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, 'monotonic', clock)
+    return clock
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = ResponseCache(ttl=10)
+    cache.put('a', b'body')
+    clock.now += 10
+    assert cache.get('a') == b'body'
+    clock.now += 0.5
+    assert cache.get('a') is None
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['bytes'] == 0
+
+
+def test_least_recently_used_entry_is_evicted_past_max_entries():
+    cache = ResponseCache(max_entries=2)
+    cache.put('a', b'1')
+    cache.put('b', b'2')
+    assert cache.get('a') == b'1'
+    cache.put('c', b'3')
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1'
+    assert cache.get('c') == b'3'
+    assert cache.evictions == 1
+
+
+def test_entries_are_evicted_past_max_bytes():
+    cache = ResponseCache(max_bytes=10)
+    cache.put('a', b'x' * 4)
+    cache.put('b', b'x' * 4)
+    cache.put('c', b'x' * 4)
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 8
+    # A body larger than the whole cache is not stored at all
+    cache.put('d', b'x' * 11)
+    assert cache.get('d') is None
+    assert cache.stats()['entries'] == 2
+
+
+def test_hit_and_miss_counters():
+    cache = ResponseCache()
+    assert cache.get('a') is None
+    cache.put('a', b'body')
+    cache.get('a')
+    cache.get('a')
+    assert cache.stats() == {
+        'entries': 1, 'bytes': 4, 'hits': 2, 'misses': 1, 'evictions': 0, 'hit_ratio': 0.6667,
+    }
+
+
+def test_key_ignores_course_order_and_false_preferences():
+    version = ('catalog', 'grades', 1)
+    key = recommendation_cache_key('CSE', ['CSE 1320', 'CSE\xa01310'], {'caring': True, 'easyGrader': False}, version)
+    assert key == recommendation_cache_key('CSE', ['CSE 1310', 'CSE 1320', 'CSE 1310'], {'caring': 1}, version)
+    assert key != recommendation_cache_key('CSE', ['CSE 1310'], {'caring': True}, version)
+    assert key != recommendation_cache_key('CE', ['CSE 1320', 'CSE 1310'], {'caring': True}, version)
+
+
+def test_key_changes_with_the_data_version():
+    args = ('CSE', ['CSE 1310'], {'caring': True})
+    assert recommendation_cache_key(*args, ('catalog', 'grades', 1)) != recommendation_cache_key(
+        *args, ('catalog', 'grades', 2)
+    )
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp('data')
+    synthetic.generate(str(data_dir), scale=0.5, seed=11)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('DATA_DIR', str(data_dir))
+        mp.setenv('SQLALCHEMY_DATABASE_URI', 'sqlite:///' + str(data_dir / 'professors.db'))
+        from app import create_app
+        yield create_app().test_client()
+
+
+def test_repeated_request_is_served_from_the_cache_and_revalidates(client):
+    response_cache.recommendation_cache.clear()
+    form = {'department': 'CSE', 'completed_courses': '["CSE 1000"]', 'preferences': '{"caring": true}'}
+    first = client.post('/api/recommendations', data=form)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    hits = response_cache.recommendation_cache.hits
+    second = client.post('/api/recommendations', data=form)
+    assert second.get_data() == first.get_data()
+    assert second.headers['ETag'] == etag
+    assert response_cache.recommendation_cache.hits == hits + 1
+
+    not_modified = client.post('/api/recommendations', data=form, headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.get_data() == b''
+    assert not_modified.headers['ETag'] == etag
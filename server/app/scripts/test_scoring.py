@@ -0,0 +1,126 @@
+import itertools
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.scoring import TAG_PHRASES, calculate_match_score, professor_features, score_professors
+
+PREFERENCE_FLAGS = (
+    'extraCredit', 'easyGrader', 'clearGrading', 'caring', 'goodFeedback', 'lectureHeavy',
+    'groupProjects', 'testHeavy', 'homeworkHeavy', 'strictAttendance', 'popQuizzes',
+)
+
+
+def reference_match_score(professor_obj, user_prefs):
+    # The substring-scanning scorer from routes.py before tags became bitmasks
+    if not professor_obj:
+        return 0.0
+
+    try:
+        base_score = float(professor_obj.rating) if professor_obj.rating else 2.5
+    except:
+        base_score = 2.5
+
+    score = base_score
+
+    try:
+        difficulty = float(professor_obj.difficulty) if professor_obj.difficulty else 3.0
+    except:
+        difficulty = 3.0
+
+    try:
+        tags_str = str(professor_obj.tags).lower() if professor_obj.tags else ""
+    except:
+        tags_str = ""
+
+    if user_prefs.get('extraCredit'):
+        if "extra credit" in tags_str:
+            score += 1.0
+
+    if user_prefs.get('easyGrader') or user_prefs.get('clearGrading'):
+        difficulty_bonus = (5.0 - difficulty) * 0.5
+        score += difficulty_bonus
+
+        if any(t in tags_str for t in ['easy grader', 'clear grading', 'graded by few things']):
+            score += 1.0
+        if any(t in tags_str for t in ['tough grader', 'hard grader']):
+            score -= 1.5
+
+    if user_prefs.get('caring') or user_prefs.get('goodFeedback'):
+        if any(t in tags_str for t in ['caring', 'respected', 'inspirational', 'accessible', 'good feedback']):
+            score += 1.2
+
+    if user_prefs.get('lectureHeavy'):
+        if "amazing lectures" in tags_str:
+            score += 1.5
+        elif "lecture heavy" in tags_str:
+            score += 0.5
+
+    if user_prefs.get('groupProjects'):
+        if "group projects" in tags_str:
+            score += 1.0
+    else:
+        if "group projects" in tags_str:
+            score -= 0.5
+
+    if not user_prefs.get('testHeavy'):
+        if any(t in tags_str for t in ['test heavy', 'tests are tough']):
+            score -= 1.5
+
+    if not user_prefs.get('homeworkHeavy'):
+        if any(t in tags_str for t in ['lots of homework', 'so many papers']):
+            score -= 1.0
+
+    if not user_prefs.get('strictAttendance'):
+        if any(t in tags_str for t in ['attendance mandatory', 'skip class']):
+            score -= 1.0
+
+    if not user_prefs.get('popQuizzes'):
+        if "pop quizzes" in tags_str:
+            score -= 2.0
+
+    return round(score, 1)
+
+
+def random_professors(count, seed=11):
+    rng = random.Random(seed)
+    ratings = [None, '', 'N/A', '0', '1.7', '3.35', '4.9', 5.0, 2.25]
+    difficulties = [None, '', 'n/a', '1.0', '2.45', '3.8', 4.95, 0]
+    professors = [None]
+    for _ in range(count):
+        tags = rng.sample(TAG_PHRASES, rng.randint(0, 6))
+        tags = [t.upper() if rng.random() < 0.2 else t.title() for t in tags]
+        professors.append(SimpleNamespace(
+            rating=rng.choice(ratings),
+            difficulty=rng.choice(difficulties),
+            tags=rng.choice([', '.join(tags), ' -- '.join(tags), None]) if tags else rng.choice(['', None]),
+        ))
+    return professors
+
+
+PROFESSORS = random_professors(200)
+
+
+@pytest.mark.parametrize('enabled', [
+    flags for size in range(len(PREFERENCE_FLAGS) + 1)
+    for flags in itertools.combinations(PREFERENCE_FLAGS, size)
+    if size <= 2 or size >= len(PREFERENCE_FLAGS) - 1
+])
+def test_bitmask_scores_match_the_reference(enabled):
+    user_prefs = {flag: True for flag in enabled}
+    expected = [reference_match_score(prof, user_prefs) for prof in PROFESSORS]
+    assert score_professors(PROFESSORS, user_prefs) == expected
+    assert [calculate_match_score(prof, user_prefs) for prof in PROFESSORS] == expected
+
+
+def test_precomputed_features_score_the_same():
+    rng = random.Random(3)
+    for _ in range(200):
+        user_prefs = {flag: rng.random() < 0.5 for flag in PREFERENCE_FLAGS}
+        expected = [reference_match_score(prof, user_prefs) for prof in PROFESSORS]
+        indexed = [
+            SimpleNamespace(features=professor_features(prof.rating, prof.difficulty, prof.tags)) if prof else None
+            for prof in PROFESSORS
+        ]
+        assert score_professors(indexed, user_prefs) == expected
@@ -0,0 +1,198 @@
+import sqlite3
+
+import pytest
+import spacy
+
+from app.scripts import scraping
+
+
+def catalog_page(courses):
+    blocks = ''.join(
+        f'<div class="courseblock"><p class="courseblocktitle">{code}. {name}. (3-0) 3</p>'
+        f'<p class="courseblockdesc">{desc}</p></div>'
+        for code, name, desc in courses
+    )
+    return f'<html><body>{blocks}</body></html>'
+
+
+CE_V1 = [
+    ('CE 1100', 'Introduction to Civil Engineering', 'Careers in civil engineering.'),
+    ('CE 2100', 'Statics', 'Forces and moments. Prerequisite: CE 1100.'),
+    ('CE 3100', 'Surveying', 'Field measurements. Corequisite: CE 2100.'),
+]
+CE_V2 = [
+    CE_V1[0],
+    ('CE 2100', 'Statics', 'Forces, moments and trusses. Prerequisite: CE 1100.'),
+    ('CE 4100', 'Capstone Design', 'Team design project. Prerequisite: CE 2100 or CE 3100.'),
+]
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    nlp = spacy.blank('en')
+    nlp.add_pipe('sentencizer')
+    parsed = []
+
+    def extract_requisites_batch(descriptions, *args, **kwargs):
+        parsed.append(list(descriptions))
+        return original(descriptions, *args, **kwargs)
+
+    original = scraping.extract_requisites_batch
+    monkeypatch.setattr(scraping, 'get_nlp', lambda *args, **kwargs: nlp)
+    monkeypatch.setattr(scraping, 'extract_requisites_batch', extract_requisites_batch)
+    monkeypatch.setattr(scraping, '_requisite_memo', {})
+    monkeypatch.setattr(scraping, '_parsed_departments', {})
+    monkeypatch.setattr(scraping, 'prefetch_departments', lambda departments: None)
+    db_path = tmp_path / 'classes.db'
+    monkeypatch.setenv('SCRAPER_DB_PATH', str(db_path))
+    return db_path, parsed
+
+
+def stored_rows(db_path, table='ClassesForCE'):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[0]: row[1:] for row in conn.execute(
+            f"SELECT Course_Num, Pre_Requisites, Co_Requisites, Description, Content_Hash FROM {table}"
+        )}
+    finally:
+        conn.close()
+
+
+def test_first_scrape_adds_every_course(scraper):
+    db_path, parsed = scraper
+    report = scraping.insert_courses(catalog_page(CE_V1), 'CE')
+
+    assert report == {'added': ['CE 1100', 'CE 2100', 'CE 3100'], 'changed': [], 'removed': [], 'unchanged': 0}
+    rows = stored_rows(db_path)
+    assert rows['CE 2100'][0] == 'CE 1100'
+    assert rows['CE 3100'][1] == 'CE 2100'
+    assert len(parsed[-1]) == 3
+    _, _, hashes = scraping.find_course_blocks(catalog_page(CE_V1))
+    assert [rows[code][3] for code, _, _ in CE_V1] == hashes
+
+
+def test_incremental_scrape_skips_unchanged_and_removes_delisted(scraper):
+    db_path, parsed = scraper
+    scraping.insert_courses(catalog_page(CE_V1), 'CE')
+    # A prerequisite from another department stored in the same table
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("INSERT INTO ClassesForCE VALUES ('MATH 1426', 'Calculus I', '', '', '', NULL)")
+    conn.close()
+
+    report = scraping.insert_courses(catalog_page(CE_V2), 'CE')
+
+    assert report == {'added': ['CE 4100'], 'changed': ['CE 2100'], 'removed': ['CE 3100'], 'unchanged': 1}
+    # Only the new and changed blocks reached the requisite extractor
+    assert parsed[-1] == [CE_V2[1][2], CE_V2[2][2]]
+    rows = stored_rows(db_path)
+    assert set(rows) == {'CE 1100', 'CE 2100', 'CE 4100', 'MATH 1426'}
+    assert rows['CE 2100'][2] == CE_V2[1][2]
+    assert rows['CE 4100'][0] == 'CE 2100|CE 3100'
+
+    # Nothing changed since the last run
+    report = scraping.insert_courses(catalog_page(CE_V2), 'CE')
+    assert report == {'added': [], 'changed': [], 'removed': [], 'unchanged': 3}
+    assert parsed[-1] == []
+    assert stored_rows(db_path) == rows
+
+
+def test_full_refresh_reparses_everything_and_keeps_delisted(scraper):
+    db_path, parsed = scraper
+    scraping.insert_courses(catalog_page(CE_V1), 'CE')
+
+    report = scraping.insert_courses(catalog_page(CE_V2), 'CE', incremental=False)
+
+    # Everything is parsed again, but only real differences are reported
+    assert report == {'added': ['CE 4100'], 'changed': ['CE 2100'], 'removed': [], 'unchanged': 1}
+    assert len(parsed[-1]) == 3
+    assert set(stored_rows(db_path)) == {'CE 1100', 'CE 2100', 'CE 3100', 'CE 4100'}
+
+
+def test_older_tables_gain_the_hash_column(scraper):
+    db_path, _ = scraper
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("""CREATE TABLE ClassesForCE(
+                            Course_Num VARCHAR(10) NOT NULL PRIMARY KEY,
+                            Course_Name VARCHAR(100) NOT NULL,
+                            Pre_Requisites VARCHAR(200),
+                            Co_Requisites VARCHAR(200),
+                            Description VARCHAR(1000)
+                            )""")
+        conn.execute("INSERT INTO ClassesForCE VALUES ('CE 1100', 'Old name', '', '', 'Old text.')")
+    conn.close()
+
+    report = scraping.insert_courses(catalog_page(CE_V1), 'CE')
+    assert report['changed'] == ['CE 1100']
+    assert all(row[3] for row in stored_rows(db_path).values())
+
+
+def course_row(code, name='Course', content_hash=None):
+    return (code, name, '', '', f'{code} description.', content_hash)
+
+
+def test_catalog_writer_flushes_every_table_in_one_transaction(tmp_path):
+    db_path = tmp_path / 'classes.db'
+    writer = scraping.CatalogWriter(str(db_path))
+    writer.open_table('ClassesForCE')
+    writer.open_table('ClassesForCSE')
+    writer.add('ClassesForCE', course_row('CE 1100'))
+    writer.flush()
+
+    reader = sqlite3.connect(db_path)
+    assert reader.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    # A reader mid-transaction keeps its snapshot while the writer commits
+    reader.execute("BEGIN")
+    assert reader.execute("SELECT COUNT(*) FROM ClassesForCE").fetchone()[0] == 1
+
+    writer.add('ClassesForCE', course_row('CE 2100'))
+    writer.add('ClassesForCSE', course_row('CSE 1310'))
+    writer.delete('ClassesForCE', ['CE 1100'])
+    assert reader.execute("SELECT COUNT(*) FROM ClassesForCSE").fetchone()[0] == 0
+    assert writer.flush() == 2
+
+    assert reader.execute("SELECT Course_Num FROM ClassesForCE").fetchall() == [('CE 1100',)]
+    reader.execute("COMMIT")
+    assert reader.execute("SELECT Course_Num FROM ClassesForCE").fetchall() == [('CE 2100',)]
+    assert reader.execute("SELECT Course_Num FROM ClassesForCSE").fetchall() == [('CSE 1310',)]
+    reader.close()
+    writer.close()
+
+
+def test_catalog_writer_writes_nothing_when_a_table_fails(tmp_path):
+    db_path = tmp_path / 'classes.db'
+    writer = scraping.CatalogWriter(str(db_path))
+    writer.open_table('ClassesForCE')
+    writer.add('ClassesForCE', course_row('CE 1100'))
+    writer.flush()
+
+    writer.add('ClassesForCE', course_row('CE 2100'))
+    writer.delete('ClassesForCE', ['CE 1100'])
+    writer.add('ClassesForMATH', course_row('MATH 1426'))  # table was never opened
+    with pytest.raises(sqlite3.OperationalError):
+        writer.flush()
+    writer.close()
+
+    assert set(stored_rows(db_path)) == {'CE 1100'}
+
+
+def test_catalog_writer_tracks_stored_and_queued_courses(tmp_path):
+    db_path = tmp_path / 'classes.db'
+    writer = scraping.CatalogWriter(str(db_path))
+    writer.open_table('ClassesForCE')
+    writer.add('ClassesForCE', course_row('CE 1100', content_hash='abc'))
+    writer.flush()
+    writer.close()
+
+    writer = scraping.CatalogWriter(str(db_path))
+    assert writer.open_table('ClassesForCE') == {'CE 1100': 'abc'}
+    assert writer.has('ClassesForCE', 'CE 1100')
+    writer.add('ClassesForCE', course_row('CE 2100'))
+    assert writer.has('ClassesForCE', 'CE  2100')
+
+    full = scraping.CatalogWriter(str(db_path))
+    full.open_table('ClassesForCE', incremental=False)
+    assert not full.has('ClassesForCE', 'CE 1100')
+    writer.close()
+    full.close()
@@ -0,0 +1,169 @@
+import io
+import json
+import os
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.scripts import transcript_jobs as jobs_module
+from app.scripts.transcript_cache import TranscriptCache, transcript_digest
+from app.scripts.transcript_jobs import TranscriptJobs
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), '../../../data/sample_transcript.pdf')
+
+
+class StalledPool:
+    """A pool whose futures never finish, like a worker that died mid-job."""
+
+    def submit(self, fn, *args):
+        return Future()
+
+
+class BrokenPool:
+    """A pool left unusable by a worker that was killed."""
+
+    def submit(self, fn, *args):
+        raise BrokenProcessPool('A child process terminated abruptly')
+
+    def shutdown(self, wait=True):
+        pass
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    # Keep parses out of the shared transcript cache
+    monkeypatch.setattr(jobs_module, 'transcript_cache', TranscriptCache())
+    return TranscriptJobs(str(tmp_path / 'jobs.sqlite'), max_workers=1, heartbeat_interval=0.05, stale_after=5)
+
+
+def wait_until_finished(jobs, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        status = jobs.status(job_id)
+        if status['status'] == 'finished' or time.monotonic() > deadline:
+            return status
+        time.sleep(0.05)
+
+
+def test_submit_status_and_results(jobs):
+    with open(SAMPLE_PDF, 'rb') as f:
+        pdf = f.read()
+    job_id = jobs.submit([('a.pdf', pdf), ('b.pdf', pdf), ('junk.pdf', b'not a pdf')])
+
+    status = wait_until_finished(jobs, job_id)
+    assert (status['status'], status['total'], status['done'], status['failed']) == ('finished', 3, 2, 1)
+    assert all('courses' not in f for f in status['files'])
+
+    results = jobs.status(job_id, include_courses=True)
+    a, b, junk = results['files']
+    assert 'CE 1105' in a['courses'] and a['courses'] == b['courses']
+    assert junk['status'] == 'failed' and 'courses' not in junk and junk['error']
+    assert jobs.status('no-such-job') is None
+
+
+def test_live_job_stays_queued_while_its_owner_beats(jobs, monkeypatch):
+    monkeypatch.setattr(jobs, '_get_pool', StalledPool)
+    jobs.stale_after = 0.5
+    job_id = jobs.submit([('a.pdf', b'%PDF stalled')])
+    time.sleep(1)
+    assert jobs.status(job_id)['status'] == 'queued'
+
+
+def test_orphaned_job_is_reported_failed(jobs, monkeypatch):
+    monkeypatch.setattr(jobs, '_get_pool', StalledPool)
+    monkeypatch.setattr(jobs, '_start_heartbeat', lambda: None)  # the owner is gone
+    jobs.stale_after = 0.2
+    job_id = jobs.submit([('a.pdf', b'%PDF orphaned')])
+    assert jobs.status(job_id)['status'] == 'queued'
+
+    time.sleep(0.3)
+    status = jobs.status(job_id)
+    assert (status['status'], status['failed']) == ('finished', 1)
+    assert 'exited' in status['files'][0]['error']
+
+
+def test_broken_pool_is_replaced(jobs):
+    jobs._pool = BrokenPool()
+    job_id = jobs.submit([('junk.pdf', b'not a pdf')])
+
+    status = wait_until_finished(jobs, job_id)
+    assert not isinstance(jobs._pool, BrokenPool)
+    assert status['failed'] == 1 and 'terminated' not in status['files'][0]['error']
+
+
+def test_job_fails_when_the_pool_cannot_be_replaced(jobs, monkeypatch):
+    monkeypatch.setattr(jobs_module, 'ProcessPoolExecutor', lambda max_workers: BrokenPool())
+    job_id = jobs.submit([('a.pdf', b'%PDF one'), ('b.pdf', b'%PDF two')])
+
+    status = jobs.status(job_id)
+    assert (status['status'], status['failed']) == ('finished', 2)
+    assert 'terminated abruptly' in status['files'][0]['error']
+    # Nothing is left for the heartbeat to keep alive
+    assert jobs._active == {}
+
+
+def test_status_stream_ends_when_the_job_is_purged(jobs, monkeypatch):
+    from app import create_app, routes
+
+    monkeypatch.setattr(jobs, '_get_pool', StalledPool)
+    monkeypatch.setattr(routes, 'transcript_jobs', jobs)
+    monkeypatch.setattr(routes, 'JOB_STREAM_INTERVAL', 0.01)
+    job_id = jobs.submit([('a.pdf', b'%PDF stalled')])
+
+    status = jobs.status
+    calls = []
+
+    def purged_after_first_watch(job_id, include_courses=False):
+        calls.append(job_id)
+        if len(calls) > 2:
+            # Another submit's retention sweep removed the job
+            jobs.retention = 0
+            jobs.submit([])
+        return status(job_id, include_courses)
+
+    monkeypatch.setattr(jobs, 'status', purged_after_first_watch)
+    response = create_app().test_client().get(f'/api/transcript-jobs/{job_id}?stream=1')
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert response.status_code == 200
+    assert lines[0]['status'] == 'queued'
+    assert lines[-1] == {'jobId': job_id, 'status': 'gone'}
+
+
+def test_job_uploads_share_one_byte_budget(jobs, monkeypatch):
+    import io
+
+    from app import create_app, routes
+
+    monkeypatch.setattr(jobs, '_get_pool', StalledPool)
+    monkeypatch.setattr(routes, 'transcript_jobs', jobs)
+    monkeypatch.setattr(routes, 'TRANSCRIPT_JOB_MAX_BYTES', 25)
+    client = create_app().test_client()
+
+    def post(*sizes):
+        files = [(io.BytesIO(b'%' * size), f'{i}.pdf') for i, size in enumerate(sizes)]
+        return client.post('/api/transcript-jobs', data={'transcripts': files}, content_type='multipart/form-data')
+
+    assert post(10, 10).status_code == 202
+    response = post(10, 10, 10)
+    assert response.status_code == 413
+    assert response.get_json()['reason'] == 'too_large'
+    assert jobs.stats()['submitted'] == 2
+
+
+def test_uploads_and_jobs_share_the_transcript_cache_key(monkeypatch):
+    from werkzeug.datastructures import FileStorage
+
+    from app import routes
+
+    with open(SAMPLE_PDF, 'rb') as f:
+        pdf = f.read()
+    assert transcript_digest([pdf[:100], pdf[100:]]) == transcript_digest(pdf)
+
+    cache = TranscriptCache()
+    cache.put(transcript_digest(pdf), ['CE 1105'])
+    monkeypatch.setattr(routes, 'transcript_cache', cache)
+    monkeypatch.setattr(routes, 'parse_transcript_sandboxed', lambda buffer: pytest.fail('re-parsed a cached PDF'))
+    monkeypatch.setattr(routes, 'UPLOAD_CHUNK_SIZE', 1000)
+    assert routes.courses_from_upload(FileStorage(io.BytesIO(pdf), 'a.pdf')) == ['CE 1105']
@@ -0,0 +1,83 @@
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.scripts import transcript_sandbox
+from app.scripts import parse_transcript
+from app.scripts.parse_transcript import TranscriptParseError, parse_courses
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), '../../../data/sample_transcript.pdf')
+
+
+def hang(*args, **kwargs):
+    time.sleep(30)
+
+
+def balloon(*args, **kwargs):
+    return bytearray(2 * 1024 ** 3)
+
+
+def test_sample_transcript_parses():
+    with open(SAMPLE_PDF, 'rb') as f:
+        courses = transcript_sandbox.parse_transcript_sandboxed(f.read())
+    assert 'CE 1105' in courses
+
+
+class NoReadAllStream(io.BytesIO):
+    """An upload that fails if anything tries to slurp it whole."""
+
+    def read(self, size=-1):
+        assert size is not None and size >= 0, 'whole file read into memory'
+        return super().read(size)
+
+
+@pytest.mark.parametrize('backend', ['pdfium', 'pdfplumber'])
+def test_file_objects_are_parsed_without_reading_them_whole(backend):
+    with open(SAMPLE_PDF, 'rb') as f:
+        data = f.read()
+    assert parse_courses(NoReadAllStream(data), [backend]) == parse_courses(data, [backend])
+
+
+@pytest.mark.parametrize('data, limits, reason', [
+    (b'not a pdf', {}, 'unreadable'),
+    (b'x' * 200, {'max_bytes': 100}, 'too_large'),
+])
+def test_bad_uploads_raise(data, limits, reason):
+    with pytest.raises(TranscriptParseError) as error:
+        transcript_sandbox.parse_transcript_sandboxed(data, **limits)
+    assert error.value.reason == reason
+
+
+def test_page_limit():
+    with open(SAMPLE_PDF, 'rb') as f, pytest.raises(TranscriptParseError) as error:
+        transcript_sandbox.parse_transcript_sandboxed(f.read(), max_pages=1)
+    assert error.value.reason == 'too_many_pages'
+
+
+@pytest.mark.parametrize('parser, reason', [(hang, 'timeout'), (balloon, 'memory')])
+def test_runaway_parse_is_stopped(monkeypatch, parser, reason):
+    # The forked child inherits the patched parser
+    monkeypatch.setattr(transcript_sandbox, 'parse_courses', parser)
+    start = time.monotonic()
+    with pytest.raises(TranscriptParseError) as error:
+        transcript_sandbox.parse_transcript_sandboxed(b'%PDF', timeout=0.5, memory_limit_mb=256)
+    assert error.value.reason == reason
+    assert time.monotonic() - start < 5
+
+
+@pytest.mark.parametrize('start_method', ['fork', 'forkserver'])
+def test_concurrent_parses(monkeypatch, start_method):
+    monkeypatch.setattr(transcript_sandbox, 'START_METHOD', start_method)
+    with open(SAMPLE_PDF, 'rb') as f:
+        data = f.read()
+    expected = parse_courses(data)
+
+    # Children start while another thread holds the PDFium lock; none may inherit it held
+    with parse_transcript._pdfium_lock, ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(
+            lambda _: transcript_sandbox.parse_transcript_sandboxed(io.BytesIO(data), timeout=10), range(12)
+        ))
+    assert results == [expected] * 12
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def transcript_digest(pdf):
+    """
+    SHA-256 of an uploaded PDF, given as bytes or as an iterable of byte
+    chunks (hashed as they stream in); the cache key for a transcript.
+    """
+    if isinstance(pdf, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(pdf).hexdigest()
+    digest = hashlib.sha256()
+    for chunk in pdf:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """
+    Bounded LRU of parsed transcripts, keyed by the SHA-256 of the PDF.
+
+    Lives in process; if `db_path` is set, entries are also written to a
+    small SQLite table so every gunicorn worker on the box can reuse a parse.
+    """
+
+    def __init__(self, max_entries=256, db_path=None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute("""CREATE TABLE IF NOT EXISTS transcript_cache(
+                                digest TEXT NOT NULL PRIMARY KEY,
+                                courses TEXT NOT NULL,
+                                last_used REAL NOT NULL
+                                )""")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, digest):
+        """Returns the cached course list for a digest, or None."""
+        with self._lock:
+            courses = self._entries.get(digest)
+            if courses is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return list(courses)
+
+        if self.db_path:
+            try:
+                conn = self._connect()
+                try:
+                    row = conn.execute("SELECT courses FROM transcript_cache WHERE digest = ?", (digest,)).fetchone()
+                    if row:
+                        conn.execute("UPDATE transcript_cache SET last_used = ? WHERE digest = ?", (time.time(), digest))
+                        conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"Transcript cache read failed: {e}")
+                row = None
+            if row:
+                courses = json.loads(row[0])
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(digest, courses)
+                return list(courses)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, digest, courses):
+        courses = tuple(courses)
+        with self._lock:
+            self._remember(digest, courses)
+
+        if self.db_path:
+            try:
+                conn = self._connect()
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO transcript_cache (digest, courses, last_used) VALUES (?, ?, ?)",
+                        (digest, json.dumps(list(courses)), time.time())
+                    )
+                    # Keep the shared table bounded too
+                    conn.execute(
+                        """DELETE FROM transcript_cache WHERE digest NOT IN (
+                               SELECT digest FROM transcript_cache ORDER BY last_used DESC LIMIT ?)""",
+                        (self.max_entries,)
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"Transcript cache write failed: {e}")
+
+    def _remember(self, digest, courses):
+        self._entries[digest] = tuple(courses)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_ratio': round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# TRANSCRIPT_CACHE_DB=/path/to/cache.sqlite shares parses between workers
+transcript_cache = TranscriptCache(
+    max_entries=int(os.getenv('TRANSCRIPT_CACHE_SIZE', '256')),
+    db_path=os.getenv('TRANSCRIPT_CACHE_DB') or None,
+)
@@ -0,0 +1,268 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from .recommendation_engine import get_data_dir
+from .transcript_cache import transcript_cache, transcript_digest
+from .transcript_sandbox import parse_transcript_sandboxed
+
+# Per-file states; a job is finished once none of its files is still queued
+QUEUED, DONE, FAILED = 'queued', 'done', 'failed'
+
+
+class TranscriptJobs:
+    """
+    Bulk transcript parsing in the background.
+
+    A job is a batch of uploaded PDFs. They are parsed by a bounded process
+    pool (each parse in its own transcript sandbox, with the transcript
+    cache in front) in the worker that accepted the upload, while job and
+    per-file state live in a SQLite table so any gunicorn worker on the box
+    can report status and results. The owning worker stamps a heartbeat on
+    its unfinished jobs; files of a job whose heartbeat goes stale are
+    reported failed, since nobody is left to parse them.
+    """
+
+    def __init__(self, db_path, max_workers=2, retention=24 * 3600, heartbeat_interval=10, stale_after=60):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.retention = retention
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self._pool = None
+        self._lock = threading.Lock()
+        self._db_ready = False
+        # job_id -> PDFs of it still being parsed here
+        self._active = {}
+        self._heartbeat = None
+        self.submitted = 0
+        self.parsed = 0
+        self.failed = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        if not self._db_ready:
+            with self._lock:
+                if not self._db_ready:
+                    self._init_db(conn)
+                    self._db_ready = True
+        return conn
+
+    def _init_db(self, conn):
+        # Readers in other workers poll while this one writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(transcript_jobs)")}
+        if 'owner_pid' in columns:
+            # Job state is short-lived; drop tables from before heartbeats rather than migrate them
+            conn.execute("DROP TABLE transcript_jobs")
+            conn.execute("DROP TABLE IF EXISTS transcript_job_files")
+        conn.execute("""CREATE TABLE IF NOT EXISTS transcript_jobs(
+                            job_id TEXT NOT NULL PRIMARY KEY,
+                            created_at REAL NOT NULL,
+                            heartbeat_at REAL NOT NULL
+                            )""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS transcript_job_files(
+                            job_id TEXT NOT NULL,
+                            position INTEGER NOT NULL,
+                            filename TEXT,
+                            digest TEXT NOT NULL,
+                            status TEXT NOT NULL,
+                            courses TEXT,
+                            error TEXT,
+                            updated_at REAL NOT NULL,
+                            PRIMARY KEY (job_id, position)
+                            )""")
+        conn.commit()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def _submit_parse(self, pdf_bytes):
+        """
+        Submits one parse to the pool. A worker that died abruptly (OOM kill,
+        segfault) leaves the executor broken for good, so it is replaced once
+        before giving up.
+        """
+        pool = self._get_pool()
+        try:
+            return pool.submit(parse_transcript_sandboxed, pdf_bytes)
+        except BrokenProcessPool:
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            pool.shutdown(wait=False)
+            return self._get_pool().submit(parse_transcript_sandboxed, pdf_bytes)
+
+    def _start_heartbeat(self):
+        with self._lock:
+            if self._heartbeat is None or not self._heartbeat.is_alive():
+                self._heartbeat = threading.Thread(target=self._beat, name='transcript-job-heartbeat', daemon=True)
+                self._heartbeat.start()
+
+    def _beat(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self._lock:
+                active = list(self._active)
+            if not active:
+                continue
+            try:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.executemany("UPDATE transcript_jobs SET heartbeat_at = ? WHERE job_id = ?",
+                                         [(time.time(), job_id) for job_id in active])
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"Transcript job heartbeat failed: {e}")
+
+    def submit(self, uploads):
+        """
+        Queues a job for [(filename, pdf_bytes), ...] and returns its id.
+        Transcripts already in the transcript cache finish immediately, and
+        identical PDFs within a job are parsed once.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        rows = []
+        to_parse = {}  # digest -> (pdf bytes, [positions])
+        for position, (filename, pdf_bytes) in enumerate(uploads):
+            digest = transcript_digest(pdf_bytes)
+            courses = transcript_cache.get(digest)
+            if courses is not None:
+                rows.append((job_id, position, filename, digest, DONE, json.dumps(courses), None, now))
+                continue
+            rows.append((job_id, position, filename, digest, QUEUED, None, None, now))
+            to_parse.setdefault(digest, (pdf_bytes, []))[1].append(position)
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM transcript_job_files WHERE job_id IN "
+                             "(SELECT job_id FROM transcript_jobs WHERE created_at < ?)", (now - self.retention,))
+                conn.execute("DELETE FROM transcript_jobs WHERE created_at < ?", (now - self.retention,))
+                conn.execute("INSERT INTO transcript_jobs (job_id, created_at, heartbeat_at) VALUES (?, ?, ?)",
+                             (job_id, now, now))
+                conn.executemany("INSERT INTO transcript_job_files VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        finally:
+            conn.close()
+
+        if to_parse:
+            with self._lock:
+                self._active[job_id] = len(to_parse)
+            self._start_heartbeat()
+        with self._lock:
+            self.submitted += len(rows)
+        for digest, (pdf_bytes, positions) in to_parse.items():
+            try:
+                future = self._submit_parse(pdf_bytes)
+            except Exception as e:
+                # Record the files as failed rather than leave them queued with a live heartbeat
+                future = Future()
+                future.set_exception(e)
+            future.add_done_callback(partial(self._finish, job_id, digest, positions))
+        return job_id
+
+    def _finish(self, job_id, digest, positions, future):
+        """Pool callback: records one parsed (or failed) PDF for every position it appears at."""
+        try:
+            courses = future.result()
+            status, payload, error = DONE, json.dumps(courses), None
+            if courses:
+                transcript_cache.put(digest, courses)
+        except Exception as e:
+            status, payload, error = FAILED, None, str(e) or type(e).__name__
+        with self._lock:
+            if status == DONE:
+                self.parsed += len(positions)
+            else:
+                self.failed += len(positions)
+            self._active[job_id] -= 1
+            if not self._active[job_id]:
+                del self._active[job_id]
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        "UPDATE transcript_job_files SET status = ?, courses = ?, error = ?, updated_at = ? "
+                        "WHERE job_id = ? AND position = ?",
+                        [(status, payload, error, time.time(), job_id, position) for position in positions]
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Transcript job update failed: {e}")
+
+    def status(self, job_id, include_courses=False):
+        """
+        Job summary plus one entry per file, or None for an unknown job.
+        Files still queued when the job's heartbeat is stale are reported failed.
+        """
+        conn = self._connect()
+        try:
+            job = conn.execute("SELECT created_at, heartbeat_at FROM transcript_jobs WHERE job_id = ?",
+                               (job_id,)).fetchone()
+            if job is None:
+                return None
+            rows = conn.execute(
+                "SELECT position, filename, status, courses, error FROM transcript_job_files "
+                "WHERE job_id = ? ORDER BY position", (job_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        created_at, heartbeat_at = job
+        orphaned = time.time() - heartbeat_at > self.stale_after
+        files = []
+        for position, filename, status, courses, error in rows:
+            if status == QUEUED and orphaned:
+                status, error = FAILED, 'The worker parsing this job exited before finishing'
+            entry = {'position': position, 'filename': filename, 'status': status}
+            if error:
+                entry['error'] = error
+            if include_courses and status == DONE:
+                entry['courses'] = json.loads(courses)
+            files.append(entry)
+
+        counts = {state: sum(1 for f in files if f['status'] == state) for state in (QUEUED, DONE, FAILED)}
+        if counts[QUEUED] == 0:
+            job_status = 'finished'
+        elif counts[QUEUED] == len(files):
+            job_status = 'queued'
+        else:
+            job_status = 'running'
+        return {
+            'jobId': job_id,
+            'status': job_status,
+            'createdAt': created_at,
+            'total': len(files),
+            'queued': counts[QUEUED],
+            'done': counts[DONE],
+            'failed': counts[FAILED],
+            'files': files,
+        }
+
+    def stats(self):
+        with self._lock:
+            return {'submitted': self.submitted, 'parsed': self.parsed, 'failed': self.failed}
+
+
+# TRANSCRIPT_JOBS_DB should be on a disk every gunicorn worker can see
+transcript_jobs = TranscriptJobs(
+    db_path=os.getenv('TRANSCRIPT_JOBS_DB') or os.path.join(get_data_dir(), 'transcript_jobs.sqlite'),
+    max_workers=int(os.getenv('TRANSCRIPT_JOB_WORKERS', '2')),
+    retention=float(os.getenv('TRANSCRIPT_JOB_RETENTION', str(24 * 3600))),
+    heartbeat_interval=float(os.getenv('TRANSCRIPT_JOB_HEARTBEAT', '10')),
+    stale_after=float(os.getenv('TRANSCRIPT_JOB_STALE_AFTER', '60')),
+)
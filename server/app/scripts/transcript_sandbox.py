@@ -0,0 +1,166 @@
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from typing import BinaryIO, List, Union
+
+try:
+    import resource
+except ImportError:  # not on Windows; the wall-clock limit still applies
+    resource = None
+
+from .parse_transcript import TranscriptParseError, parse_courses
+
+# --- TRANSCRIPT SANDBOX ---
+# Each upload is parsed in a throwaway child process under byte, page,
+# wall-clock and memory limits. A PDF that hangs or balloons inside
+# pdfplumber/PDFium gets the child killed and a TranscriptParseError with a
+# distinct reason, instead of pinning an API worker or returning [].
+
+MAX_BYTES = int(os.getenv('TRANSCRIPT_MAX_BYTES', str(10 * 1024 * 1024)))
+MAX_PAGES = int(os.getenv('TRANSCRIPT_MAX_PAGES', '40'))
+TIMEOUT = float(os.getenv('TRANSCRIPT_PARSE_TIMEOUT', '15'))
+# Address space the child may add on top of what it starts with
+MEMORY_LIMIT_MB = int(os.getenv('TRANSCRIPT_MEMORY_LIMIT_MB', '512'))
+# fork starts a child in milliseconds with the parser already imported, and
+# parse_transcript re-creates its locks after a fork. Forking a threaded
+# process is only safe enough on Linux (macOS system libraries can deadlock
+# in the child), so elsewhere children come from a forkserver with this
+# module preloaded, or are spawned.
+def _default_start_method():
+    methods = multiprocessing.get_all_start_methods()
+    if sys.platform.startswith('linux') and 'fork' in methods:
+        return 'fork'
+    return 'forkserver' if 'forkserver' in methods else 'spawn'
+
+
+START_METHOD = os.getenv('TRANSCRIPT_SANDBOX_START') or _default_start_method()
+
+_contexts = {}
+_context_lock = threading.Lock()
+_stats = {'parsed': 0, 'rejected': 0}
+_stats_lock = threading.Lock()
+
+
+def _get_context():
+    with _context_lock:
+        context = _contexts.get(START_METHOD)
+        if context is None:
+            context = _contexts[START_METHOD] = multiprocessing.get_context(START_METHOD)
+            if START_METHOD == 'forkserver':
+                context.set_forkserver_preload([__name__])
+        return context
+
+
+def _mapped_bytes() -> int:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+def _apply_limits(timeout: float, memory_limit_mb: int) -> None:
+    if resource is None:
+        return
+    try:
+        if memory_limit_mb:
+            limit = _mapped_bytes() + memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        if timeout:
+            # Backstop for a child the parent somehow fails to kill
+            seconds = math.ceil(timeout) + 1
+            resource.setrlimit(resource.RLIMIT_CPU, (seconds, seconds + 1))
+    except (ValueError, OSError) as e:
+        print(f"Transcript sandbox limits not applied: {e}")
+
+
+def _parse_in_child(conn, source, max_pages, timeout, memory_limit_mb):
+    # Runs in the sandbox process; always answers with a picklable tuple
+    try:
+        _apply_limits(timeout, memory_limit_mb)
+        result = ('ok', parse_courses(source, max_pages=max_pages))
+    except TranscriptParseError as e:
+        result = ('error', str(e), e.reason)
+    except MemoryError:
+        result = ('error', f"Parsing the transcript needed more than {memory_limit_mb} MB", 'memory')
+    except Exception as e:
+        result = ('error', f"Could not read the transcript PDF: {e}", 'unreadable')
+    conn.send(result)
+    conn.close()
+
+
+def _upload_size(source) -> int:
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    position = source.tell()
+    size = source.seek(0, os.SEEK_END) - position
+    source.seek(position)
+    return size
+
+
+def parse_transcript_sandboxed(source: Union[str, bytes, BinaryIO], max_bytes: int = MAX_BYTES,
+                               max_pages: int = MAX_PAGES, timeout: float = TIMEOUT,
+                               memory_limit_mb: int = MEMORY_LIMIT_MB) -> List[str]:
+    """
+    parse_courses in a child process under the given limits (0 disables one).
+    Raises TranscriptParseError with reason too_large, too_many_pages, timeout,
+    memory, crashed or unreadable; the child is killed if still running.
+    """
+    try:
+        size = _upload_size(source)
+        if max_bytes and size > max_bytes:
+            raise TranscriptParseError(
+                f"Transcript is {size} bytes; at most {max_bytes} are accepted", 'too_large'
+            )
+        if START_METHOD != 'fork' and not isinstance(source, (str, bytes, bytearray)):
+            source.seek(0)
+            source = source.read()  # only a forked child can share the open file
+
+        context = _get_context()
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_parse_in_child, args=(sender, source, max_pages, timeout, memory_limit_mb), daemon=True
+        )
+        process.start()
+        sender.close()
+
+        result = None
+        timed_out = False
+        try:
+            if receiver.poll(timeout or None):
+                result = receiver.recv()
+        except EOFError:
+            pass  # the child died before answering
+        finally:
+            if process.is_alive():
+                timed_out = result is None
+                process.kill()
+            process.join()
+            receiver.close()
+
+        if result is None:
+            if timed_out or process.exitcode == -getattr(signal, 'SIGXCPU', 0):
+                raise TranscriptParseError(f"Parsing the transcript took longer than {timeout:g}s", 'timeout')
+            raise TranscriptParseError(
+                f"The transcript parser exited unexpectedly (exit code {process.exitcode})", 'crashed'
+            )
+        if result[0] == 'error':
+            raise TranscriptParseError(result[1], result[2])
+    except TranscriptParseError:
+        with _stats_lock:
+            _stats['rejected'] += 1
+        raise
+
+    with _stats_lock:
+        _stats['parsed'] += 1
+    return result[1]
+
+
+def stats():
+    with _stats_lock:
+        return dict(_stats)
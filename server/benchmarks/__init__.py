@@ -0,0 +1 @@
+"""Standalone benchmarks for the Smart Advisors server. Run them from ``server/``."""
@@ -0,0 +1,151 @@
+"""
+Compares /api/recommendations/batch with one /api/recommendations call per
+student on synthetic data.
+
+The cohort is deliberately diverse: every student gets a random department,
+a random set of completed courses and a random setting for every preference
+flag, so few students share an eligible set or a preference combination.
+Both paths run warm (catalog, graphs and candidates cached) with the
+response cache cleared, and the report gives students per second for each
+and the batch speedup. The batch shares more work the larger the cohort.
+
+    python -m benchmarks.batch --students 1000 --output batch.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from . import synthetic
+from .pipeline import git_revision
+
+PREFERENCE_FLAGS = (
+    'extraCredit', 'easyGrader', 'clearGrading', 'caring', 'goodFeedback', 'lectureHeavy',
+    'groupProjects', 'testHeavy', 'homeworkHeavy', 'strictAttendance', 'popQuizzes',
+)
+
+
+def make_cohort(engine, count, seed):
+    """`count` students over the first two departments, each drawn independently."""
+    rng = random.Random(seed)
+    departments = engine.list_departments()[:2]
+    codes = {
+        department: [engine.normalize_code(course['Course_Num']) for course in engine.get_department_courses(department)]
+        for department in departments
+    }
+    students = []
+    for i in range(count):
+        department = rng.choice(departments)
+        taken = rng.randint(0, len(codes[department]) // 2)
+        students.append({
+            'id': f"student-{i}",
+            'department': department,
+            'completed_courses': rng.sample(codes[department], taken),
+            'preferences': {flag: rng.random() < 0.5 for flag in PREFERENCE_FLAGS},
+        })
+    return students
+
+
+def bench_cohort(data_dir, students_count, repeat, seed):
+    os.environ['DATA_DIR'] = data_dir
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(data_dir, 'professors.db')
+
+    from app import create_app
+    from app.response_cache import recommendation_cache
+    from app.scripts import recommendation_engine as engine
+
+    engine.consolidate_grade_tables()
+    app = create_app()
+    client = app.test_client()
+    with app.app_context():
+        students = make_cohort(engine, students_count, seed)
+
+    def singles():
+        recommendation_cache.clear()
+        for student in students:
+            response = client.post('/api/recommendations', data={
+                'department': student['department'],
+                'completed_courses': json.dumps(student['completed_courses']),
+                'preferences': json.dumps(student['preferences']),
+            })
+            assert response.status_code == 200, response.get_data(as_text=True)[:200]
+
+    def batch():
+        response = client.post('/api/recommendations/batch', json={'students': students})
+        return response.status_code, response.get_data()
+
+    # Warm the catalog, prerequisite graphs and candidate cache for both paths
+    singles()
+    status, body = batch()
+    assert status == 200 and body.count(b'\n') == len(students) + 1, body[:200]
+
+    # Interleaved, so a noisy neighbour slows both paths alike, and each from
+    # a collected heap so one path does not pay for the other's garbage
+    samples = {'single': [], 'batch': []}
+    for _ in range(repeat):
+        for name, fn in (('single', singles), ('batch', batch)):
+            gc.collect()
+            start = time.perf_counter()
+            fn()
+            samples[name].append(time.perf_counter() - start)
+
+    results = {}
+    for name in ('single', 'batch'):
+        seconds = statistics.median(samples[name])
+        results[name] = {
+            'median_ms': round(seconds * 1000, 3),
+            'students_per_s': round(len(students) / seconds, 1),
+        }
+    results['speedup'] = round(results['batch']['students_per_s'] / results['single']['students_per_s'], 2)
+    results['students'] = len(students)
+    results['distinct_preferences'] = len({
+        frozenset(k for k, v in s['preferences'].items() if v) for s in students
+    })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-root', help='where to generate data (default: a temp dir)')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    data_dir = os.path.join(args.data_root or tempfile.mkdtemp(prefix='smartadvisors-batch-'), f"scale-{args.scale:g}")
+    print(f"Generating {args.scale:g}x data in {data_dir}...", file=sys.stderr)
+    summary = synthetic.generate(data_dir, args.scale, args.seed)
+    result = bench_cohort(data_dir, args.students, args.repeat, args.seed)
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'scale': args.scale,
+        'data': summary,
+        **result,
+    }
+
+    print(f"\n{result['students']} students, {result['distinct_preferences']} distinct preference sets")
+    for name in ('single', 'batch'):
+        print(f"  {name:8} {result[name]['median_ms']:10.1f} ms  {result[name]['students_per_s']:10.1f} students/s")
+    print(f"  speedup  {result['speedup']:10.2f}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    main()
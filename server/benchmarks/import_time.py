@@ -0,0 +1,74 @@
+"""
+Measures the cost of importing the catalog scraper.
+
+Each scenario runs in a fresh interpreter so module caches do not carry over.
+"import" is what tools pay for COURSE_RE / find_data now that the spaCy model
+loads lazily; "import+model" adds the first get_nlp() call, which is what every
+import used to cost.
+
+    python -m benchmarks.import_time --repeat 5 --output import_time.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "import": "import app.scripts.scraping",
+    "import+model": "import app.scripts.scraping as s; s.get_nlp()",
+}
+
+# Runs in the child: times the statement and reports peak RSS in KiB
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+exec(sys.argv[1])
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+"""
+
+
+def run_scenario(statement, repeat):
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE, statement],
+            cwd=SERVER_DIR, capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    seconds = [r["seconds"] for r in runs]
+    return {
+        "statement": statement,
+        "runs": repeat,
+        "median_seconds": statistics.median(seconds),
+        "min_seconds": min(seconds),
+        "max_rss_kb": max(r["max_rss_kb"] for r in runs),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    results = {name: run_scenario(stmt, args.repeat) for name, stmt in SCENARIOS.items()}
+    for name, r in results.items():
+        print(f"{name:14} {r['median_seconds'] * 1000:9.1f} ms  {r['max_rss_kb'] / 1024:8.1f} MiB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
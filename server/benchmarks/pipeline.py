@@ -0,0 +1,182 @@
+"""
+Times each stage of the recommendation pipeline on synthetic data.
+
+For every scale it generates a data directory (see benchmarks.synthetic),
+points the app at it through DATA_DIR / SQLALCHEMY_DATABASE_URI, then times
+catalog loading, eligibility, offerings lookup, professor matching, scoring,
+the cached recommendation builder and the full /api/recommendations request
+through the Flask test client. Results are written as JSON so two commits
+can be compared run against run.
+
+    python -m benchmarks.pipeline --scales 1 10 100 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import synthetic
+
+# A fixed "student": the first third of the department is done
+COMPLETED_FRACTION = 1 / 3
+PREFERENCES = {'easyGrader': True, 'caring': True, 'lectureHeavy': True, 'groupProjects': False}
+
+
+def timed(fn, repeat, setup=None):
+    """Runs fn `repeat` times (calling setup before each) and summarizes in ms."""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'runs': repeat,
+        'median_ms': round(statistics.median(samples), 3),
+        'min_ms': round(min(samples), 3),
+        'max_ms': round(max(samples), 3),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_scale(data_dir, repeat):
+    """Times every stage against the databases in data_dir."""
+    os.environ['DATA_DIR'] = data_dir
+    os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(data_dir, 'professors.db')
+
+    from app import create_app
+    from app.professor_index import professor_index
+    from app.recommender import candidate_cache, build_recommendations
+    from app.response_cache import recommendation_cache
+    from app.scoring import calculate_match_score, score_professors
+    from app.scripts import recommendation_engine as engine
+
+    # Ingestion step, as a deployment runs it after loading grade tables
+    engine.consolidate_grade_tables()
+    app = create_app()
+    department = engine.list_departments()[0]
+    results = {'department': department}
+
+    with app.app_context():
+        courses = engine.get_department_courses(department)
+        completed = [
+            engine.normalize_code(course['Course_Num'])
+            for course in courses[:int(len(courses) * COMPLETED_FRACTION)]
+        ]
+        eligible = engine.get_prerequisite_graph(department).eligible(completed)
+        codes = list(eligible)
+        offerings = engine.get_offerings_for_courses(codes)
+        names = {name for offers in offerings.values() for offer in offers for name in offer['instructors'] if name}
+        professors = [prof for prof in professor_index.resolve_many(names).values() if prof]
+        results['sizes'] = {
+            'catalog_courses': len(courses),
+            'completed': len(completed),
+            'eligible': len(eligible),
+            'offerings': sum(len(offers) for offers in offerings.values()),
+            'instructors': len(names),
+            'matched_professors': len(professors),
+        }
+
+        def reset_professor_index():
+            professor_index.version = None
+
+        stages = {
+            'catalog_cold': timed(lambda: engine.get_department_courses(department), repeat,
+                                  setup=engine._catalog_cache.clear),
+            'catalog_warm': timed(lambda: engine.get_department_courses(department), repeat),
+            'eligibility_uncached': timed(
+                lambda: engine.filter_eligible_courses_unique(courses, completed), repeat),
+            'eligibility_graph': timed(
+                lambda: engine.get_prerequisite_graph(department).eligible(completed), repeat),
+            'offerings_batched': timed(lambda: engine.get_offerings_for_courses(codes), repeat),
+            'offerings_per_course': timed(
+                lambda: [engine.get_professor_offerings_for_course(code) for code in codes], repeat),
+            'professor_index_build': timed(professor_index.refresh, repeat, setup=reset_professor_index),
+            'professor_match': timed(lambda: professor_index.resolve_many(names), repeat),
+            'scoring_batched': timed(lambda: score_professors(professors, PREFERENCES), repeat),
+            'scoring_per_professor': timed(
+                lambda: [calculate_match_score(prof, PREFERENCES) for prof in professors], repeat),
+            'recommendations_cold': timed(
+                lambda: build_recommendations(department, eligible, PREFERENCES), repeat,
+                setup=candidate_cache.clear),
+            'recommendations_warm': timed(
+                lambda: build_recommendations(department, eligible, PREFERENCES), repeat),
+        }
+
+    client = app.test_client()
+    form = {
+        'department': department,
+        'completed_courses': json.dumps(completed),
+        'preferences': json.dumps(PREFERENCES),
+    }
+
+    def post():
+        response = client.post('/api/recommendations', data=form)
+        assert response.status_code == 200, response.get_data(as_text=True)[:200]
+
+    def reset_request_caches():
+        recommendation_cache.clear()
+        candidate_cache.clear()
+
+    stages['request_cold'] = timed(post, repeat, setup=reset_request_caches)
+    stages['request_candidates_cached'] = timed(post, repeat, setup=recommendation_cache.clear)
+    stages['request_response_cached'] = timed(post, repeat)
+    results['stages'] = stages
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-root', help='where to generate data (default: a temp dir)')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    data_root = args.data_root or tempfile.mkdtemp(prefix='smartadvisors-bench-')
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'scales': {},
+    }
+    for scale in args.scales:
+        data_dir = os.path.join(data_root, f"scale-{scale:g}")
+        print(f"Generating {scale:g}x data in {data_dir}...", file=sys.stderr)
+        summary = synthetic.generate(data_dir, scale, args.seed)
+        result = bench_scale(data_dir, args.repeat)
+        result['data'] = summary
+        report['scales'][f"{scale:g}x"] = result
+
+        print(f"\n{scale:g}x  ({summary['courses']} courses, {summary['professors']} professors)")
+        for name, stage in result['stages'].items():
+            print(f"  {name:28} {stage['median_ms']:10.2f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    main()
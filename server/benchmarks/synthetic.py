@@ -0,0 +1,239 @@
+"""
+Deterministic synthetic data for the benchmarks.
+
+Writes a data directory laid out like ``data/`` (classes.db, grades.sqlite,
+professors.db) whose sizes are a multiple of what the repo ships today:
+~192 catalog courses over two departments, 1,530 professors and several
+terms of grade distributions. The same (scale, seed) always produces the
+same rows, so timings can be compared between commits.
+
+    python -m benchmarks.synthetic --scale 10 --output /tmp/sa-data-10x
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+
+# Today's bundled data, i.e. scale 1
+BASE_COURSES = 192
+BASE_PROFESSORS = 1530
+TERMS = ('Fall 2022', 'Spring 2023', 'Summer 2023', 'Fall 2023', 'Spring 2024', 'Fall 2024')
+
+# Course numbers are four digits, 1000-4999 undergrad like the scraper keeps
+MAX_COURSES_PER_DEPARTMENT = 4000
+DEPARTMENTS = ('CSE', 'CE', 'EE', 'ME', 'IE', 'AE', 'BME', 'MAE', 'ARCH', 'CHEM')
+# Service departments that only show up as outside prerequisites
+OUTSIDE_PREREQS = ('MATH 1426', 'MATH 2425', 'PHYS 1443', 'PHYS 1444', 'ENGL 1301', 'IE 3301')
+
+FIRST_NAMES = (
+    'Aaron', 'Abdul', 'Aditi', 'Alex', 'Ana', 'Bahram', 'Bill', 'Carlos', 'Chen', 'Dana',
+    'David', 'Elena', 'Farhad', 'Gautam', 'Grace', 'Hao', 'Ishfaq', 'Jia', 'Karen', 'Kumar',
+    'Laura', 'Li', 'Manfred', 'Maria', 'Mohammad', 'Nadia', 'Omar', 'Priya', 'Ramez', 'Sajib',
+    'Sara', 'Shawn', 'Tomas', 'Vassilis', 'Wei', 'Yonghe', 'Zhen',
+)
+LAST_NAMES = (
+    'Smallwood', 'Rasheed', 'Prabhakar', 'Lee', 'Garcia', 'Khalili', 'Carroll', 'Nguyen',
+    'Zaruba', 'Elmasri', 'Becker', 'Huber', 'Kamangar', 'Levine', 'Das', 'Athitsos',
+    'Conly', 'Johnson', 'Park', 'Kumar', 'Ahmad', 'Tiernan', 'Patel', 'Wang', 'Liu', 'Zhang',
+    'Ortiz', 'Kim', 'Chen', 'Brown', 'Davis', 'Lopez', 'Moore', 'Taylor', 'Walker', 'Young',
+)
+TAGS = (
+    'Tough grader', 'Amazing lectures', 'Caring', 'Respected', 'Clear grading criteria',
+    'Gives good feedback', 'Lots of homework', 'Test heavy', 'Group projects', 'EXTRA CREDIT',
+    'Lecture heavy', 'Accessible outside class', 'Inspirational', 'Participation matters',
+    "Skip class? You won't pass.", 'Graded by few things', 'Get ready to read', 'Pop quizzes',
+    'So many papers', 'Hilarious', 'Beware of pop quizzes', 'Tests are tough',
+)
+
+
+def catalog_layout(scale):
+    """(departments, courses per department) for a scale factor."""
+    total = int(BASE_COURSES * scale)
+    count = min(max(2, -(-total // MAX_COURSES_PER_DEPARTMENT)), len(DEPARTMENTS))
+    return DEPARTMENTS[:count], min(-(-total // count), MAX_COURSES_PER_DEPARTMENT)
+
+
+def course_code(department, index, sep='\xa0'):
+    # Spread courses over 1000-4999, low numbers first, like the real catalog
+    return f"{department}{sep}{1000 + index}"
+
+
+def write_classes(path, departments, per_department, rng):
+    conn = sqlite3.connect(path)
+    catalog = {}
+    for department in departments:
+        table = f"ClassesFor{department}"
+        conn.execute(f"""CREATE TABLE {table}(
+                            Course_Num VARCHAR(10) NOT NULL PRIMARY KEY,
+                            Course_Name VARCHAR(100) NOT NULL,
+                            Pre_Requisites VARCHAR(200),
+                            Co_Requisites VARCHAR(200),
+                            Description VARCHAR(1000)
+                            )""")
+        rows = []
+        codes = []
+        for i in range(per_department):
+            prereqs = []
+            if i and rng.random() < 0.7:
+                # 1-3 AND clauses on earlier courses, some of them "A|B" OR groups
+                for _ in range(rng.randint(1, 3)):
+                    first = course_code(department, rng.randrange(max(0, i - 40), i), ' ')
+                    if rng.random() < 0.2:
+                        other = course_code(department, rng.randrange(max(0, i - 40), i), ' ')
+                        prereqs.append(f"{first}|{other}")
+                    else:
+                        prereqs.append(first)
+                if rng.random() < 0.2:
+                    prereqs.append(rng.choice(OUTSIDE_PREREQS))
+            coreqs = ''
+            if i and rng.random() < 0.05:
+                coreqs = course_code(department, rng.randrange(max(0, i - 10), i), ' ')
+            code = course_code(department, i)
+            codes.append(code)
+            rows.append((
+                code,
+                f"SYNTHETIC COURSE {department} {1000 + i}.  3 Hours.",
+                ', '.join(dict.fromkeys(prereqs)),
+                coreqs,
+                f"Synthetic description for {department} {1000 + i}. " * 4,
+            ))
+        conn.executemany(f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?)", rows)
+        catalog[department] = codes
+    conn.commit()
+    conn.close()
+    return catalog
+
+
+def professor_names(count, rng):
+    names = []
+    seen = set()
+    while len(names) < count:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if name in seen:
+            # Same trick the real data has: a middle initial tells people apart
+            name = f"{name.split()[0]} {chr(65 + len(names) % 26)}. {name.split()[1]}"
+            if name in seen:
+                name = f"{name} {len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def write_professors(path, names, rng):
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE professors (
+                        id TEXT PRIMARY KEY,
+                        name TEXT,
+                        rmp_name TEXT,
+                        url TEXT,
+                        department TEXT,
+                        quality_rating TEXT,
+                        difficulty_rating TEXT,
+                        total_ratings TEXT,
+                        would_take_again TEXT,
+                        tags TEXT
+                    )""")
+    rows = []
+    for i, name in enumerate(names):
+        prof_id = str(100000 + i)
+        rated = rng.random() < 0.9
+        rows.append((
+            prof_id,
+            name,
+            name if rng.random() < 0.9 else name.upper(),
+            f"https://www.ratemyprofessors.com/professor/{prof_id}",
+            'Engineering',
+            f"{rng.uniform(1, 5):.1f}" if rated else 'N/A',
+            f"{rng.uniform(1, 5):.1f}" if rated else 'N/A',
+            str(rng.randint(1, 200)),
+            f"{rng.randint(0, 100)}%" if rated else 'N/A',
+            ', '.join(rng.sample(TAGS, rng.randint(0, 5))),
+        ))
+    conn.executemany("INSERT INTO professors VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def instructor_variant(name, rng):
+    """How a professor's name shows up in the grade distributions."""
+    first, last = name.split(' ', 1)
+    r = rng.random()
+    if r < 0.5:
+        return name
+    if r < 0.7:
+        return f"{last}, {first}"
+    if r < 0.8:
+        return name.upper()
+    if r < 0.9:
+        return f"{rng.choice(FIRST_NAMES)}x {last.split()[-1]}"
+    return 'Staff'
+
+
+def write_grades(path, catalog, names, rng):
+    conn = sqlite3.connect(path)
+    for term in TERMS:
+        semester, year = term.split()
+        conn.execute(f'''CREATE TABLE "{term}" (
+                            subject_id TEXT, course_number TEXT, course_title TEXT,
+                            year INTEGER, semester TEXT,
+                            instructor1 TEXT, instructor2 TEXT, instructor3 TEXT,
+                            instructor4 TEXT, instructor5 TEXT, course_gpa REAL
+                        )''')
+        rows = []
+        for department, codes in catalog.items():
+            for code in codes:
+                if rng.random() < 0.35:
+                    continue
+                number = code.split('\xa0')[1]
+                for _ in range(rng.randint(1, 3)):
+                    instructors = [instructor_variant(rng.choice(names), rng) for _ in range(rng.randint(1, 2))]
+                    instructors += [None] * (5 - len(instructors))
+                    rows.append((
+                        department, number, f"Synthetic {code}", int(year), semester,
+                        *instructors, round(rng.uniform(1.5, 4.0), 2),
+                    ))
+        conn.executemany(f'INSERT INTO "{term}" VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+    conn.commit()
+    conn.close()
+
+
+def generate(output_dir, scale=1, seed=0):
+    """
+    Writes classes.db, grades.sqlite and professors.db for `scale` into
+    output_dir (replacing any previous files) and returns a size summary.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for filename in ('classes.db', 'grades.sqlite', 'professors.db'):
+        for suffix in ('', '-wal', '-shm'):
+            path = os.path.join(output_dir, filename + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+    rng = random.Random(f"{seed}:{scale}")
+    departments, per_department = catalog_layout(scale)
+    catalog = write_classes(os.path.join(output_dir, 'classes.db'), departments, per_department, rng)
+    names = professor_names(int(BASE_PROFESSORS * scale), rng)
+    write_professors(os.path.join(output_dir, 'professors.db'), names, rng)
+    write_grades(os.path.join(output_dir, 'grades.sqlite'), catalog, names, rng)
+    return {
+        'scale': scale,
+        'seed': seed,
+        'departments': list(departments),
+        'courses': sum(len(codes) for codes in catalog.values()),
+        'professors': len(names),
+        'terms': len(TERMS),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True, help='directory to write the databases to')
+    args = parser.parse_args(argv)
+    print(generate(args.output, args.scale, args.seed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Typed professor rating columns and a professor_tags table
+
+Revision ID: 3f2a9c1d7b4e
+Revises: 
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b4e'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# The scraper stored every rating as text, e.g. '3.8', '49', '84%', 'N/A'.
+# Professor ids are RateMyProfessor ids, also text, and stay that way;
+# professor_tags.professor_id has the same type.
+ID_TYPE = sa.Text()
+
+NUMERIC_COLUMNS = (
+    ('quality_rating', sa.Float()),
+    ('difficulty_rating', sa.Float()),
+    ('total_ratings', sa.Integer()),
+    ('would_take_again', sa.Float()),
+)
+
+professors = sa.table(
+    'professors',
+    sa.column('id', ID_TYPE),
+    sa.column('quality_rating'),
+    sa.column('difficulty_rating'),
+    sa.column('total_ratings'),
+    sa.column('would_take_again'),
+    sa.column('tags', sa.Text()),
+)
+
+
+def _to_number(value, cast):
+    if value is None:
+        return None
+    text = str(value).strip().rstrip('%')
+    try:
+        return cast(float(text)) if cast is int else cast(text)
+    except ValueError:
+        return None
+
+
+def _split_tags(tags):
+    seen = []
+    for tag in str(tags or '').split(','):
+        tag = tag.strip()
+        if tag and tag.lower() not in (t.lower() for t in seen):
+            seen.append(tag)
+    return seen
+
+
+def _rewrite_columns(conn, rows, new_types):
+    """Blank the rating columns, change their types, then write `rows` back."""
+    conn.execute(professors.update().values(**{name: None for name, _ in NUMERIC_COLUMNS}))
+    with op.batch_alter_table('professors') as batch_op:
+        for name, new_type in new_types:
+            batch_op.alter_column(name, type_=new_type, existing_nullable=True)
+    for row in rows:
+        conn.execute(
+            professors.update()
+            .where(professors.c.id == row['id'])
+            .values(**{name: row[name] for name, _ in NUMERIC_COLUMNS})
+        )
+
+
+def upgrade():
+    conn = op.get_bind()
+    rows = []
+    tag_rows = []
+    for row in conn.execute(sa.select(professors)).mappings():
+        rows.append({
+            'id': row['id'],
+            'quality_rating': _to_number(row['quality_rating'], float),
+            'difficulty_rating': _to_number(row['difficulty_rating'], float),
+            'total_ratings': _to_number(row['total_ratings'], int),
+            # Stored as a percentage, 0-100
+            'would_take_again': _to_number(row['would_take_again'], float),
+        })
+        tag_rows.extend({'professor_id': row['id'], 'tag': tag} for tag in _split_tags(row['tags']))
+
+    _rewrite_columns(conn, rows, NUMERIC_COLUMNS)
+
+    professor_tags = op.create_table(
+        'professor_tags',
+        sa.Column('professor_id', ID_TYPE, sa.ForeignKey('professors.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('tag', sa.String(length=64), nullable=False),
+        sa.PrimaryKeyConstraint('professor_id', 'tag'),
+    )
+    op.create_index('ix_professor_tags_tag', 'professor_tags', ['tag'])
+    if tag_rows:
+        op.bulk_insert(professor_tags, tag_rows)
+
+
+def downgrade():
+    op.drop_index('ix_professor_tags_tag', table_name='professor_tags')
+    op.drop_table('professor_tags')
+
+    conn = op.get_bind()
+    rows = []
+    for row in conn.execute(sa.select(professors)).mappings():
+        values = {'id': row['id']}
+        for name, _ in NUMERIC_COLUMNS:
+            value = row[name]
+            if value is None:
+                values[name] = None
+            elif name == 'would_take_again':
+                values[name] = f"{value:g}%"
+            else:
+                values[name] = f"{value:g}"
+        rows.append(values)
+
+    _rewrite_columns(conn, rows, [(name, sa.Text()) for name, _ in NUMERIC_COLUMNS])